@@ -0,0 +1,71 @@
+import heapq
+from grid import EMPTY, NO_CELL
+
+def manhattan(a, b):
+    return abs(a[0] - b[0]) + abs(a[1] - b[1])
+
+def astar_search(game, is_ai=False):
+    if is_ai:
+        snake = game.ai_snake
+    else:
+        snake = game.snake
+        
+    start = snake[0]  # Head of the snake
+    goal = game.food
+    if start == goal:
+        return []
+    
+    # Cells are grid indices, with moves read from the grid's neighbour table
+    grid = game.grid
+    width, height, cells, adjacency = grid.width, grid.height, grid.cells, grid.adjacency
+    source, target = grid.index(start), grid.index(goal)
+    goal_x, goal_y = goal
+    
+    # Open set ordered by f = g + h; ties go to the cell closer to the goal,
+    # then to the leftmost, topmost cell (x * height + y orders cells like
+    # (x, y) tuples). The Manhattan heuristic is consistent on a 4-connected
+    # grid, so a cell is final the first time it is popped and the path is optimal.
+    h = manhattan(start, goal)
+    open_set = [(h, h, start[0] * height + start[1], source)]
+    g_score = {source: 0}
+    visited = {source: None}
+    closed = set()
+    expanded = 0
+    
+    with grid.tail_vacated(grid.index(snake[-1])):
+        while open_set:
+            _, _, _, current = heapq.heappop(open_set)
+        
+            if current == target:
+                break
+            if current in closed:
+                continue  # Stale entry, already expanded with a lower cost
+            closed.add(current)
+            expanded += 1
+        
+            tentative_g = g_score[current] + 1
+            for neighbor in adjacency[4 * current:4 * current + 4]:
+                if (neighbor != NO_CELL and cells[neighbor] == EMPTY and
+                    tentative_g < g_score.get(neighbor, tentative_g + 1)):
+                    g_score[neighbor] = tentative_g
+                    visited[neighbor] = current
+                    y, x = divmod(neighbor, width)
+                    h = abs(x - goal_x) + abs(y - goal_y)
+                    heapq.heappush(open_set, (tentative_g + h, h, x * height + y, neighbor))
+    game.nodes_expanded += expanded
+    
+    # If food was not found
+    if target not in visited:
+        # Try to find any safe move (an empty path if there is none)
+        return [grid.position(neighbor) for neighbor in grid.open_neighbors(source)[:1]]
+        
+    # Reconstruct path
+    path = []
+    current = target
+    
+    while current != source:
+        path.append(grid.position(current))
+        current = visited[current]
+        
+    path.reverse()
+    return path
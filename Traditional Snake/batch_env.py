@@ -0,0 +1,277 @@
+"""Many independent single-player games stepped together with NumPy.
+
+BatchSnakeEnv holds N boards in stacked arrays: an occupancy plane per
+board (the codes from grid.py), each snake's body as a ring buffer of
+cell indices with a head pointer and a length, and the food, scores and
+timers. step() moves every snake at once with the rules of
+SnakeEngine.move_player and update(): walls, obstacles and bodies kill,
+the tail cell may be entered because it moves away, food grows the snake
+and scores 1 (2 for bonus food, doubled while the double score bonus is
+on), Challenge games end after 60 seconds and Survival games speed up.
+Finished boards start a new game straight away.
+
+Games use numpy's generator for their randomness, so a seeded batch does
+not replay the same games as a seeded SnakeEngine, only the same rules.
+
+    python batch_env.py --boards 4096 --steps 1000
+"""
+import argparse
+import time
+import numpy as np
+from engine import (GRID_WIDTH, GRID_HEIGHT, FRAME_TIME, DIFFICULTY_SETTINGS)
+from grid import EMPTY, OBSTACLE, PLAYER
+
+# Action codes: right, down, left, up (the order the searches try moves in)
+DX = np.array([1, 0, -1, 0])
+DY = np.array([0, 1, 0, -1])
+
+# Why a game ended, as stored in death_cause (same names as SnakeEngine.death_cause)
+DEATH_CAUSES = ['wall', 'self', 'obstacle', 'time up', 'board full']
+WALL, SELF, HIT_OBSTACLE, TIME_UP, BOARD_FULL = range(len(DEATH_CAUSES))
+
+# Timers of SnakeEngine.reset_game, in seconds of simulated time
+DOUBLE_SCORE_DURATION = 10
+CHALLENGE_DURATION = 60
+SURVIVAL_SPEED_THRESHOLD = 5
+
+class BatchSnakeEnv:
+    """N single-player snake games advanced by one vectorized step() call.
+
+    Public arrays, one entry per board:
+        occupancy      (N, height * width) cell contents; boards() reshapes it
+        food           cell index of the food
+        score, steps   of the game in progress
+        direction      action code of the last move
+
+    When a game ends, its result is left in final_score, final_length,
+    final_steps and death_cause (an index into DEATH_CAUSES) and the board
+    is reset.
+    """
+    def __init__(self, n, width=GRID_WIDTH, height=GRID_HEIGHT, game_mode='Classic',
+                 difficulty='Normal', seed=None):
+        self.n = n
+        self.width = width
+        self.height = height
+        self.size = width * height
+        self.game_mode = game_mode
+        self.rng = np.random.default_rng(seed)
+
+        (self.base_cooldown, self.bonus_food_chance,
+         classic_obstacles, other_obstacles) = DIFFICULTY_SETTINGS[difficulty]
+        num_obstacles = classic_obstacles if game_mode == 'Classic' else other_obstacles
+        self.num_obstacles = round(num_obstacles * self.size / (GRID_WIDTH * GRID_HEIGHT))
+
+        self.rows = np.arange(n)
+        self.occupancy = np.zeros((n, self.size), dtype=np.uint8)
+        # Body cells, oldest to newest, in a ring: the head is at head_slot and
+        # the tail length - 1 slots before it
+        self.body = np.zeros((n, self.size), dtype=np.int32)
+        self.head_slot = np.zeros(n, dtype=np.int64)
+        self.length = np.ones(n, dtype=np.int64)
+        self.direction = np.zeros(n, dtype=np.int64)
+        self.food = np.zeros(n, dtype=np.int64)
+        self.is_bonus_food = np.zeros(n, dtype=bool)
+        self.score = np.zeros(n, dtype=np.int64)
+        self.steps = np.zeros(n, dtype=np.int64)
+
+        # Simulated clock, move speed and score doubling, as in SnakeEngine
+        self.clock = np.zeros(n)
+        self.move_cooldown = np.zeros(n)
+        self.double_score_active = np.zeros(n, dtype=bool)
+        self.double_score_start_time = np.zeros(n)
+        self.survival_speed_increase = np.zeros(n, dtype=np.int64)
+
+        self.final_score = np.zeros(n, dtype=np.int64)
+        self.final_length = np.zeros(n, dtype=np.int64)
+        self.final_steps = np.zeros(n, dtype=np.int64)
+        self.death_cause = np.full(n, -1, dtype=np.int64)
+        self.games_finished = 0
+
+        self.reset_boards(self.rows)
+
+    def boards(self):
+        """Occupancy as an (N, height, width) view (no copy)"""
+        return self.occupancy.reshape(self.n, self.height, self.width)
+
+    def heads(self):
+        return self.body[self.rows, self.head_slot]
+
+    def tails(self):
+        return self.body[self.rows, (self.head_slot - self.length + 1) % self.size]
+
+    def reset_boards(self, rows):
+        """Start a new game on each board in rows"""
+        width, height = self.width, self.height
+        self.occupancy[rows] = EMPTY
+        start_x, start_y = width // 4, height // 2
+        start = start_y * width + start_x
+        self.body[rows, 0] = start
+        self.head_slot[rows] = 0
+        self.length[rows] = 1
+        self.occupancy[rows, start] = PLAYER
+        self.direction[rows] = self.rng.integers(0, 4, len(rows))
+
+        self.score[rows] = 0
+        self.steps[rows] = 0
+        self.clock[rows] = 0.0
+        self.move_cooldown[rows] = self.base_cooldown
+        self.double_score_active[rows] = False
+        self.survival_speed_increase[rows] = 0
+
+        # Obstacles on empty cells, but not within 3 cells of the snake's head;
+        # like the engine, give up on an obstacle after 100 rejected cells
+        for _ in range(self.num_obstacles):
+            pending = rows
+            for _ in range(100):
+                cells = self.rng.integers(0, self.size, len(pending))
+                near = ((np.abs(cells % width - start_x) <= 3) &
+                        (np.abs(cells // width - start_y) <= 3))
+                ok = (self.occupancy[pending, cells] == EMPTY) & ~near
+                self.occupancy[pending[ok], cells[ok]] = OBSTACLE
+                pending = pending[~ok]
+                if not len(pending):
+                    break
+
+        self.place_food(rows)
+
+    def place_food(self, rows):
+        """Put new food on a random empty cell of each board in rows.
+
+        Returns the boards that had no empty cell left.
+        """
+        pending = rows
+        for _ in range(8):
+            if not len(pending):
+                break
+            cells = self.rng.integers(0, self.size, len(pending))
+            ok = self.occupancy[pending, cells] == EMPTY
+            self.food[pending[ok]] = cells[ok]
+            pending = pending[~ok]
+
+        # Nearly full boards: draw from their empty cells directly
+        full = []
+        for row in pending:
+            free = np.flatnonzero(self.occupancy[row] == EMPTY)
+            if len(free):
+                self.food[row] = self.rng.choice(free)
+            else:
+                full.append(row)
+
+        self.is_bonus_food[rows] = self.rng.random(len(rows)) < self.bonus_food_chance
+        return np.array(full, dtype=np.int64)
+
+    def step(self, actions=None):
+        """Move every snake one cell; actions holds an action code per board.
+
+        Without actions each snake keeps its direction. Returns the score
+        each board gained and which boards finished a game (and were reset).
+        """
+        rows, width, height = self.rows, self.width, self.height
+        if actions is not None:
+            self.direction[:] = actions
+
+        # Timers run at the time the move is due, before it (see SnakeEngine.update)
+        self.clock += self.move_cooldown * FRAME_TIME
+        self.double_score_active &= self.clock - self.double_score_start_time <= DOUBLE_SCORE_DURATION
+        done = np.zeros(self.n, dtype=bool)
+        if self.game_mode == 'Challenge':
+            done = self.clock >= CHALLENGE_DURATION
+            self.death_cause[done] = TIME_UP
+        self.steps[~done] += 1
+
+        head = self.heads()
+        x = head % width + DX[self.direction]
+        y = head // width + DY[self.direction]
+        inside = (x >= 0) & (x < width) & (y >= 0) & (y < height)
+        target = np.where(inside, y * width + x, 0)
+        ate = inside & (target == self.food)
+        hit = self.occupancy[rows, target]
+
+        # The tail moves away this tick unless the snake grows, so it can be entered
+        tail = self.tails()
+        free = inside & ((hit == EMPTY) | ((target == tail) & ~ate))
+        crash = ~done & ~free
+        self.death_cause[crash] = np.where(~inside[crash], WALL,
+                                           np.where(hit[crash] == OBSTACLE, HIT_OBSTACLE, SELF))
+        done |= crash
+
+        move = ~done
+        shrink = move & ~ate
+        self.occupancy[rows[shrink], tail[shrink]] = EMPTY
+        self.head_slot[move] = (self.head_slot[move] + 1) % self.size
+        self.body[rows[move], self.head_slot[move]] = target[move]
+        self.occupancy[rows[move], target[move]] = PLAYER
+
+        # Eating: score, new food, then the double score and Survival speed-ups
+        reward = np.zeros(self.n, dtype=np.int64)
+        eaters = rows[move & ate]
+        if len(eaters):
+            self.length[eaters] += 1
+            gain = np.where(self.is_bonus_food[eaters], 2, 1)
+            gain *= np.where(self.double_score_active[eaters], 2, 1)
+            self.score[eaters] += gain
+            reward[eaters] = gain
+
+            full = self.place_food(eaters)
+            self.death_cause[full] = BOARD_FULL
+            done[full] = True
+
+            start = eaters[(self.score[eaters] >= 10) & ~self.double_score_active[eaters]]
+            self.double_score_active[start] = True
+            self.double_score_start_time[start] = self.clock[start]
+
+            if self.game_mode == 'Survival':
+                level = self.score[eaters] // SURVIVAL_SPEED_THRESHOLD
+                faster = eaters[level > self.survival_speed_increase[eaters]]
+                self.survival_speed_increase[faster] = self.score[faster] // SURVIVAL_SPEED_THRESHOLD
+                self.move_cooldown[faster] = np.maximum(1, self.move_cooldown[faster] - 0.5)
+
+        finished = rows[done]
+        if len(finished):
+            self.final_score[finished] = self.score[finished]
+            self.final_length[finished] = self.length[finished]
+            self.final_steps[finished] = self.steps[finished]
+            self.games_finished += len(finished)
+            self.reset_boards(finished)
+        return reward, done
+
+def greedy_actions(env):
+    """Per board, the move that gets closest to the food without dying this tick"""
+    rows, width, height = env.rows, env.width, env.height
+    head, tail = env.heads(), env.tails()
+    x = head[:, None] % width + DX
+    y = head[:, None] // width + DY
+    inside = (x >= 0) & (x < width) & (y >= 0) & (y < height)
+    target = np.where(inside, y * width + x, 0)
+    contents = env.occupancy[rows[:, None], target]
+    safe = inside & ((contents == EMPTY) | (target == tail[:, None]))
+    distance = np.abs(x - (env.food % width)[:, None]) + np.abs(y - (env.food // width)[:, None])
+    distance = np.where(safe, distance, width + height)
+    return np.where(safe.any(axis=1), distance.argmin(axis=1), env.direction)
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the throughput of the batched environment")
+    parser.add_argument('--boards', type=int, default=4096)
+    parser.add_argument('--steps', type=int, default=1000)
+    parser.add_argument('--width', type=int, default=GRID_WIDTH)
+    parser.add_argument('--height', type=int, default=GRID_HEIGHT)
+    parser.add_argument('--mode', default='Classic', choices=['Classic', 'Challenge', 'Survival'])
+    parser.add_argument('--difficulty', default='Normal', choices=list(DIFFICULTY_SETTINGS))
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    env = BatchSnakeEnv(args.boards, args.width, args.height, args.mode, args.difficulty, args.seed)
+    scores = []
+    start = time.perf_counter()
+    for _ in range(args.steps):
+        _, done = env.step(greedy_actions(env))
+        scores.extend(env.final_score[done])
+    elapsed = time.perf_counter() - start
+
+    print(f"{args.boards * args.steps / elapsed / 1e6:.2f}M board steps per second "
+          f"({args.boards} boards x {args.steps} steps in {elapsed:.2f}s)")
+    if scores:
+        print(f"{len(scores)} games finished, mean score {np.mean(scores):.2f} with the greedy policy")
+
+if __name__ == "__main__":
+    main()
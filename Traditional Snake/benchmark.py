@@ -0,0 +1,199 @@
+"""Micro-benchmarks for the pathfinding algorithms on reproducible boards.
+
+Each board fixture is built from a seed, a grid size, a snake length and an
+obstacle density, so every algorithm is timed on exactly the same inputs.
+For each algorithm and board configuration the report shows cells expanded,
+path length, median and p99 latency and peak memory allocated per search.
+
+    python benchmark.py
+    python benchmark.py --sizes 40 100 --lengths 1 200 --json bench.json
+    python benchmark.py --baseline bench.json   # exit 1 on >20% slowdowns
+"""
+import argparse
+import itertools
+import json
+import random
+import sys
+import time
+import tracemalloc
+from collections import deque
+from engine import SnakeEngine, ALGORITHMS
+from grid import OccupancyGrid, OBSTACLE, PLAYER
+from tail_check import TailCheck
+
+MOVES = [(1, 0), (0, 1), (-1, 0), (0, -1)]
+
+def lay_snake(width, height, length, rng):
+    """Cells of a snake of the given length, head first"""
+    # Random self-avoiding walk from a random head, retried if it boxes itself in
+    for _ in range(100):
+        body = [(rng.randrange(width), rng.randrange(height))]
+        taken = set(body)
+        while len(body) < length:
+            x, y = body[-1]
+            options = [(x + dx, y + dy) for dx, dy in MOVES
+                       if 0 <= x + dx < width and 0 <= y + dy < height and (x + dx, y + dy) not in taken]
+            if not options:
+                break
+            body.append(rng.choice(options))
+            taken.add(body[-1])
+        if len(body) == length:
+            return body
+
+    # Long snakes rarely survive a random walk: use a stretch of a zigzag instead
+    zigzag = [(x if y % 2 == 0 else width - 1 - x, y) for y in range(height) for x in range(width)]
+    start = rng.randrange(len(zigzag) - length + 1)
+    return zigzag[start:start + length]
+
+class BoardFixture:
+    """A board frozen mid-game, with the attributes the search modules read.
+
+    The search functions only use the engine through snake, ai_snake, food,
+    obstacles, grid (and its neighbour table), planners, nodes_expanded,
+    tail_check and neighbor_indices, so the fixture borrows those methods
+    from SnakeEngine rather than running a game.
+    """
+    get_neighbors = SnakeEngine.get_neighbors
+    neighbor_indices = SnakeEngine.neighbor_indices
+    is_free = SnakeEngine.is_free
+    search = SnakeEngine.search
+
+    def __init__(self, width, height, snake_length, obstacle_density, seed):
+        rng = random.Random(seed)
+        self.width = width
+        self.height = height
+        self.grid = OccupancyGrid(width, height)
+        self.algorithms = list(ALGORITHMS)
+        self.current_algorithm = 0
+        self.planners = {}
+        self.nodes_expanded = 0
+        self.tail_check = TailCheck(width * height)
+
+        self.snake = deque(lay_snake(width, height, snake_length, rng))
+        for cell in self.snake:
+            self.grid.set(cell, PLAYER)
+        self.ai_snake = deque()
+
+        self.obstacles = []
+        for _ in range(int(obstacle_density * width * height)):
+            cell = self.grid.random_free(rng)
+            if cell is None:
+                break
+            self.obstacles.append(cell)
+            self.grid.set(cell, OBSTACLE)
+        self.grid.fix_obstacles(self.obstacles)
+
+        self.food = self.grid.random_free(rng)
+
+    def run(self, algorithm):
+        """One cold search (no planner state carried over); returns the path"""
+        self.current_algorithm = self.algorithms.index(algorithm)
+        self.planners = {}
+        self.grid.listeners.clear()
+        return self.search()
+
+def percentile(sorted_values, fraction):
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+def benchmark(algorithm, fixtures, repeats):
+    """Time algorithm on every fixture and return the aggregated measurements"""
+    latencies = []
+    nodes = 0
+    path_length = 0
+    peak_memory = 0
+    for fixture in fixtures:
+        # Memory is measured on a separate run: tracing slows everything down.
+        # An untraced run first keeps one-off costs (such as the lazy NumPy
+        # import of BFS-Vectorized) out of the measurement
+        fixture.run(algorithm)
+        tracemalloc.start()
+        fixture.run(algorithm)
+        peak_memory = max(peak_memory, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+
+        for _ in range(repeats):
+            fixture.nodes_expanded = 0
+            start = time.perf_counter()
+            path = fixture.run(algorithm)
+            latencies.append(time.perf_counter() - start)
+        nodes += fixture.nodes_expanded
+        path_length += len(path)
+
+    latencies.sort()
+    return {
+        'nodes_expanded': nodes / len(fixtures),
+        'path_length': path_length / len(fixtures),
+        'median_ms': 1000 * percentile(latencies, 0.5),
+        'p99_ms': 1000 * percentile(latencies, 0.99),
+        'peak_kib': peak_memory / 1024,
+    }
+
+def run_benchmarks(algorithms, sizes, lengths, densities, fixtures_per_config, repeats, seed=0):
+    rows = []
+    for size, length, density in itertools.product(sizes, lengths, densities):
+        if length + density * size * size > 0.8 * size * size:
+            continue  # Not enough room left for a meaningful board
+        fixtures = [BoardFixture(size, size, length, density, seed + i)
+                    for i in range(fixtures_per_config)]
+        for algorithm in algorithms:
+            row = {'algorithm': algorithm, 'size': size, 'length': length, 'density': density}
+            row.update(benchmark(algorithm, fixtures, repeats))
+            rows.append(row)
+            print(f"\r{len(rows)} benchmarks run", end="", file=sys.stderr, flush=True)
+    print(file=sys.stderr)
+    return rows
+
+def print_table(rows):
+    columns = ['algorithm', 'size', 'length', 'density', 'nodes_expanded', 'path_length',
+               'median_ms', 'p99_ms', 'peak_kib']
+    cells = [[f"{row[c]:.2f}" if isinstance(row[c], float) else str(row[c]) for c in columns]
+             for row in rows]
+    widths = [max(len(c), *(len(line[i]) for line in cells)) for i, c in enumerate(columns)]
+    print("  ".join(c.ljust(w) for c, w in zip(columns, widths)))
+    for line in cells:
+        print("  ".join(cell.ljust(w) for cell, w in zip(line, widths)))
+
+def find_regressions(rows, baseline, threshold):
+    """Rows whose median latency grew by more than threshold over the baseline"""
+    key = lambda row: (row['algorithm'], row['size'], row['length'], row['density'])
+    previous = {key(row): row for row in baseline}
+    regressions = []
+    for row in rows:
+        old = previous.get(key(row))
+        if old and row['median_ms'] > old['median_ms'] * (1 + threshold):
+            regressions.append((row, old))
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the pathfinding algorithms on seeded boards")
+    parser.add_argument('--algorithms', nargs='+', default=ALGORITHMS, choices=ALGORITHMS)
+    parser.add_argument('--sizes', nargs='+', type=int, default=[20, 40, 80], help="board widths (square boards)")
+    parser.add_argument('--lengths', nargs='+', type=int, default=[1, 30, 150], help="snake lengths")
+    parser.add_argument('--densities', nargs='+', type=float, default=[0.0, 0.1], help="obstacle fractions")
+    parser.add_argument('--fixtures', type=int, default=3, help="boards per configuration")
+    parser.add_argument('--repeats', type=int, default=10, help="timed searches per board")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help="write the results to this file")
+    parser.add_argument('--baseline', help="compare against results saved with --json")
+    parser.add_argument('--threshold', type=float, default=0.2, help="allowed median slowdown vs baseline")
+    args = parser.parse_args()
+
+    rows = run_benchmarks(args.algorithms, args.sizes, args.lengths, args.densities,
+                          args.fixtures, args.repeats, args.seed)
+    print_table(rows)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(rows, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = find_regressions(rows, json.load(f), args.threshold)
+        for row, old in regressions:
+            print(f"REGRESSION {row['algorithm']} size={row['size']} length={row['length']} "
+                  f"density={row['density']}: {old['median_ms']:.3f} ms -> {row['median_ms']:.3f} ms")
+        if regressions:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 import collections
+from grid import EMPTY, NO_CELL
 
 def bfs_search(game, is_ai=False):
     if is_ai:
@@ -9,31 +10,39 @@ def bfs_search(game, is_ai=False):
     start = snake[0]  # Head of the snake
     if start == game.food:
         return []
-    queue = collections.deque([start])
-    visited = {start: None}  
-    while queue:
-        current = queue.popleft()
-        if current == game.food:
-            break
-        for neighbor in game.get_neighbors(current, is_ai):
-            if neighbor not in visited:
-                queue.append(neighbor)
-                visited[neighbor] = current
+    
+    # Cells are searched by grid index, with moves read from the grid's
+    # neighbour table (walls and obstacles are NO_CELL there)
+    grid = game.grid
+    cells, adjacency = grid.cells, grid.adjacency
+    source, goal = grid.index(start), grid.index(game.food)
+    queue = collections.deque([source])
+    visited = {source: None}  
+    expanded = 0
+    with grid.tail_vacated(grid.index(snake[-1])):
+        while queue:
+            current = queue.popleft()
+            expanded += 1
+            if current == goal:
+                break
+            for neighbor in adjacency[4 * current:4 * current + 4]:
+                if neighbor not in visited and neighbor != NO_CELL and cells[neighbor] == EMPTY:
+                    queue.append(neighbor)
+                    visited[neighbor] = current
+    game.nodes_expanded += expanded
+    
     # If food was not found
-    if game.food not in visited:
-        # Try to find any safe move
-        for neighbor in game.get_neighbors(start, is_ai):
-            if neighbor not in snake:
-                return [neighbor]
-        return []  # No safe moves
+    if goal not in visited:
+        # Try to find any safe move (an empty path if there is none)
+        return [grid.position(neighbor) for neighbor in grid.open_neighbors(source)[:1]]
         
     # Reconstruct path
     path = []
-    current = game.food
+    current = goal
     
-    while current != start:
-        path.append(current)
+    while current != source:
+        path.append(grid.position(current))
         current = visited[current]
         
     path.reverse()
-    return path
\ No newline at end of file
+    return path
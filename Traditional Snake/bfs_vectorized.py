@@ -0,0 +1,146 @@
+from functools import lru_cache
+import numpy as np
+from grid import EMPTY, NO_CELL
+
+# Marks the cells a search has reached in the grid's bytes while it runs
+REACHED = 255
+
+class DistanceField:
+    """Distances of one search, in a buffer allocated once per board size.
+
+    Like TailCheck, nothing is cleared between searches. Each search raises
+    self.base by the board size (more than any distance) and stores base +
+    distance for the cells it reaches, so entries below base are from
+    earlier searches and count as not reached.
+    """
+    def __init__(self, size):
+        self.size = size
+        self.base = 0
+        self.dist = np.zeros(size, dtype=np.int64)
+        self.slot = np.empty(size, dtype=np.intp)
+
+    def next_search(self):
+        self.base += self.size
+        return self.base
+
+    def distance(self, index):
+        """Distance of the cell at index from the source, or -1 if it was not reached"""
+        distance = int(self.dist[index]) - self.base
+        return distance if distance >= 0 else -1
+
+@lru_cache(maxsize=4)
+def distance_buffers(size):
+    """The DistanceField of a board size, shared by every search on that size"""
+    return DistanceField(size)
+
+def distance_field(grid, source, target=None):
+    """Breadth-first distances from source over the empty cells of grid.
+
+    Each level's frontier is kept as an array of flat cell indices and
+    expanded to its neighbors in a handful of array operations. Occupancy
+    is read straight from the grid's bytes, where reached cells are marked
+    for the length of the search (and emptied again before it returns),
+    and the distance buffer is reused, so a search costs time in
+    proportion to the cells it reaches, whatever the board size. If target
+    is given, expansion stops as soon as a cell next to it has been
+    reached, which is all a path to target needs.
+
+    Returns the DistanceField (valid until the next search on a board of
+    the same size) and the number of cells reached.
+    """
+    width, size = grid.width, grid.width * grid.height
+    field = distance_buffers(size)
+    base = field.next_search()
+    dist, slot = field.dist, field.slot
+    cells = np.frombuffer(grid.cells, dtype=np.uint8)
+
+    frontier = np.array([source])
+    dist[frontier] = base
+    levels = [frontier]
+
+    if target is not None:
+        target_cells = np.array([neighbor for neighbor in grid.neighbors(target) if neighbor != NO_CELL])
+
+    d = 0
+    expanded = 1
+    try:
+        cells[frontier] = REACHED
+        while True:
+            d += 1
+            # Step right, left, down and up, without wrapping around the edges
+            x = frontier % width
+            reached = np.concatenate((frontier[x < width - 1] + 1,
+                                      frontier[x > 0] - 1,
+                                      frontier[frontier < size - width] + width,
+                                      frontier[frontier >= width] - width))
+            reached = reached[cells[reached] == EMPTY]
+            if not reached.size:
+                break
+
+            # Drop cells reached from two frontier cells: of the slots each cell
+            # was written to, only the last write survives
+            order = np.arange(reached.size)
+            slot[reached] = order
+            reached = reached[slot[reached] == order]
+
+            cells[reached] = REACHED
+            levels.append(reached)
+            dist[reached] = base + d
+            expanded += reached.size
+            frontier = reached
+
+            if target is not None and (dist[target_cells] >= base).any():
+                break
+    finally:
+        for level in levels:
+            cells[level] = EMPTY
+
+    return field, expanded
+
+def closest_neighbor(grid, field, index):
+    """Neighbor of index with the smallest distance in field, or None"""
+    best = None
+    best_dist = -1
+    for neighbor in grid.neighbors(index):
+        if neighbor != NO_CELL:
+            nd = field.distance(neighbor)
+            if nd >= 0 and (best is None or nd < best_dist):
+                best = neighbor
+                best_dist = nd
+    return best
+
+def bfs_vectorized_search(game, is_ai=False):
+    if is_ai:
+        snake = game.ai_snake
+    else:
+        snake = game.snake
+
+    start = snake[0]  # Head of the snake
+    if start == game.food:
+        return []
+
+    # Distances to the food; walking downhill from the head gives a shortest
+    # path. Like the snake, the search may enter the snake's own tail cell
+    grid = game.grid
+    source, food = grid.index(start), grid.index(game.food)
+    with grid.tail_vacated(grid.index(snake[-1])):
+        field, expanded = distance_field(grid, food, target=source)
+    game.nodes_expanded += expanded
+    current = closest_neighbor(grid, field, source)
+
+    # If food was not found
+    if current is None:
+        # Try to find any safe move (an empty path if there is none)
+        return [grid.position(neighbor) for neighbor in grid.open_neighbors(source)[:1]]
+
+    # Reconstruct path
+    path = [current]
+    while current != food:
+        step = field.distance(current) - 1
+        for neighbor in grid.neighbors(current):
+            if neighbor != NO_CELL and field.distance(neighbor) == step:
+                current = neighbor
+                break
+        path.append(current)
+
+    return [grid.position(index) for index in path]
@@ -1,81 +1,88 @@
-import collections
+from grid import EMPTY, NO_CELL
+
+def expand_level(grid, frontier, visited, other):
+    """Expand one whole BFS level of one side of the search.
+
+    visited maps each cell index reached from this side to (parent, depth).
+    Returns the next frontier and the best meeting with the other side as
+    (path length, cell), or None if the two sides have not touched yet.
+    """
+    cells, adjacency = grid.cells, grid.adjacency
+    next_frontier = []
+    best = None
+    for current in frontier:
+        depth = visited[current][1] + 1
+        for neighbor in adjacency[4 * current:4 * current + 4]:
+            if neighbor == NO_CELL or cells[neighbor] != EMPTY:
+                continue
+            if neighbor not in visited:
+                visited[neighbor] = (current, depth)
+                next_frontier.append(neighbor)
+            if neighbor in other:
+                length = visited[neighbor][1] + other[neighbor][1]
+                if best is None or length < best[0]:
+                    best = (length, neighbor)
+    return next_frontier, best
 
 def bidirectional_search(game, is_ai=False):
     if is_ai:
         snake = game.ai_snake
     else:
         snake = game.snake
-        
+
     start = snake[0]  # Head of the snake
     goal = game.food
-    
+
     if start == goal:
         return []
-    
-    # Forward search from start
-    forward_queue = collections.deque([start])
-    forward_visited = {start: None}
-    
-    # Backward search from goal
-    backward_queue = collections.deque([goal])
-    backward_visited = {goal: None}
-    
-    # Connection point
-    meeting_point = None
-    
-    while forward_queue and backward_queue:
-        # Expand forward search
-        current = forward_queue.popleft()
-        for neighbor in game.get_neighbors(current, is_ai):
-            if neighbor not in forward_visited:
-                forward_queue.append(neighbor)
-                forward_visited[neighbor] = current
-            if neighbor in backward_visited:
-                meeting_point = neighbor
-                break
-        
-        if meeting_point:
-            break
-            
-        # Expand backward search
-        current = backward_queue.popleft()
-        for neighbor in game.get_neighbors(current, is_ai):
-            # In backward search we need to ensure we don't create a path 
-            # that would go through the snake's body
-            if neighbor not in backward_visited and neighbor not in snake[1:]:
-                backward_queue.append(neighbor)
-                backward_visited[neighbor] = current
-            if neighbor in forward_visited:
-                meeting_point = neighbor
-                break
-        
-        if meeting_point:
-            break
-    
+
+    # Breadth-first from both ends, one whole level at a time, always growing
+    # the smaller frontier. Cells are grid indices: moves come from the grid's
+    # neighbour table and passability from the occupancy grid, both in O(1).
+    grid = game.grid
+    source, target = grid.index(start), grid.index(goal)
+    forward_visited = {source: (None, 0)}
+    backward_visited = {target: (None, 0)}
+    forward_frontier = [source]
+    backward_frontier = [target]
+
+    # The level in which the two sides first touch holds a shortest path:
+    # every shorter one would have met in an earlier level. Finishing that
+    # level and keeping its best meeting makes the result optimal.
+    meeting = None
+    expanded = 0
+    with grid.tail_vacated(grid.index(snake[-1])):
+        while forward_frontier and backward_frontier and meeting is None:
+            if len(forward_frontier) <= len(backward_frontier):
+                expanded += len(forward_frontier)
+                forward_frontier, meeting = expand_level(grid, forward_frontier,
+                                                         forward_visited, backward_visited)
+            else:
+                expanded += len(backward_frontier)
+                backward_frontier, meeting = expand_level(grid, backward_frontier,
+                                                          backward_visited, forward_visited)
+    game.nodes_expanded += expanded
+
     # If no meeting point found
-    if not meeting_point:
-        # Try to find any safe move
-        for neighbor in game.get_neighbors(start, is_ai):
-            if neighbor not in snake:
-                return [neighbor]
-        return []  # No safe moves
-        
+    if meeting is None:
+        # Try to find any safe move (an empty path if there is none)
+        return [grid.position(neighbor) for neighbor in grid.open_neighbors(source)[:1]]
+    meeting_point = meeting[1]
+
     # Reconstruct path
     path = []
-    
+
     # First half of the path (from start to meeting point)
     current = meeting_point
-    while current != start:
-        path.append(current)
-        current = forward_visited[current]
+    while current != source:
+        path.append(grid.position(current))
+        current = forward_visited[current][0]
     path.reverse()
-    
+
     # Second half of the path (from meeting point to goal)
-    current = backward_visited[meeting_point]
-    second_half = []
+    current = backward_visited[meeting_point][0]
     while current is not None:
-        second_half.append(current)
-        current = backward_visited[current]
-    
-    path.extend(second_half)
-    return path
\ No newline at end of file
+        path.append(grid.position(current))
+        current = backward_visited[current][0]
+
+    return path
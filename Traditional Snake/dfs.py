@@ -1,3 +1,5 @@
+from grid import EMPTY, NO_CELL
+
 def dfs_search(game, is_ai=False):
     if is_ai:
         snake = game.ai_snake
@@ -8,35 +10,39 @@ def dfs_search(game, is_ai=False):
     if start == game.food:
         return []
     
-    # DFS stack
-    stack = [start]
-    visited = {start: None}  
+    # DFS stack of grid indices, with moves read from the grid's neighbour table
+    grid = game.grid
+    cells, adjacency = grid.cells, grid.adjacency
+    source, goal = grid.index(start), grid.index(game.food)
+    stack = [source]
+    visited = {source: None}  
+    expanded = 0
     
-    while stack:
-        current = stack.pop()
+    with grid.tail_vacated(grid.index(snake[-1])):
+        while stack:
+            current = stack.pop()
+            expanded += 1
         
-        if current == game.food:
-            break
+            if current == goal:
+                break
             
-        for neighbor in game.get_neighbors(current, is_ai):
-            if neighbor not in visited:
-                stack.append(neighbor)
-                visited[neighbor] = current
+            for neighbor in adjacency[4 * current:4 * current + 4]:
+                if neighbor not in visited and neighbor != NO_CELL and cells[neighbor] == EMPTY:
+                    stack.append(neighbor)
+                    visited[neighbor] = current
+    game.nodes_expanded += expanded
     
     # If food was not found
-    if game.food not in visited:
-        # Try to find any safe move
-        for neighbor in game.get_neighbors(start, is_ai):
-            if neighbor not in snake:
-                return [neighbor]
-        return []  # No safe moves
+    if goal not in visited:
+        # Try to find any safe move (an empty path if there is none)
+        return [grid.position(neighbor) for neighbor in grid.open_neighbors(source)[:1]]
         
     # Reconstruct path
     path = []
-    current = game.food
+    current = goal
     
-    while current != start:
-        path.append(current)
+    while current != source:
+        path.append(grid.position(current))
         current = visited[current]
         
     path.reverse()
@@ -0,0 +1,233 @@
+import heapq
+from grid import EMPTY, NO_CELL
+
+INF = float('inf')
+
+class DStarLitePlanner:
+    """D* Lite search tree for one snake, kept alive between decisions.
+
+    The tree is rooted at the food and searched towards the snake's head,
+    so the head moving only shifts the heuristic (the km term). Cells whose
+    occupancy changes are collected from the grid's listeners, together with
+    the snake's old and new tail, and only those cells are repaired on the
+    next call.
+
+    A new food moves the root, which would invalidate every g-value in the
+    tree; repairing that costs more than starting over, so the tree is
+    rebuilt from the new food instead.
+
+    Cells are grid indices and moves come from the grid's neighbour table.
+    The planner runs inside grid.tail_vacated, so a cell can be entered
+    exactly when it is empty. Only empty cells pass their distance on, and
+    an expansion only updates the empty cells (and the head) around it;
+    sync() rechecks every cell whose occupancy changed.
+    """
+    def __init__(self, game, is_ai=False):
+        self.game = game
+        self.is_ai = is_ai
+        self.grid = game.grid
+        self.width = game.grid.width
+        self.size = game.grid.width * game.grid.height
+
+        self.g = {}
+        self.rhs = {}
+        self.queue = []
+        self.queued = {}  # cell -> key it is currently queued with
+        self.km = 0
+
+        self.goal = None
+        self.start = None
+        self.start_x = self.start_y = 0
+        self.tail = None
+        self.changed = set()
+        self.grid.listeners.append(self.changed.add)
+
+    def snake(self):
+        return self.game.ai_snake if self.is_ai else self.game.snake
+
+    def set_start(self, head):
+        self.start = head
+        self.start_y, self.start_x = divmod(head, self.width)
+
+    def heuristic(self, u):
+        y, x = divmod(u, self.width)
+        return abs(x - self.start_x) + abs(y - self.start_y)
+
+    def key(self, u):
+        """Queue order of u: by g + h, then cells whose g is too low, then larger g.
+
+        Cells with g too low are stale from before a change and must be
+        raised before anything that could read them. Among the rest,
+        expanding the cell closest to the head first heads straight for it,
+        as A* does, rather than sweeping the whole layer of equal g + h.
+        """
+        g = self.g.get(u, INF)
+        rhs = self.rhs.get(u, INF)
+        h = self.heuristic(u) + self.km
+        if g < rhs:
+            return (g + h, 0, g)
+        return (rhs + h, 1, -rhs)
+
+    def update_vertex(self, u):
+        g = self.g
+        if u != self.goal:
+            cells, adjacency = self.grid.cells, self.grid.adjacency
+            best = INF
+            for v in adjacency[4 * u:4 * u + 4]:
+                if v != NO_CELL and cells[v] == EMPTY:
+                    cost = g.get(v, INF) + 1
+                    if cost < best:
+                        best = cost
+            self.rhs[u] = best
+        self.requeue(u)
+
+    def requeue(self, u):
+        """Queue u with its current key if it is inconsistent, else take it off the queue"""
+        if self.g.get(u, INF) != self.rhs.get(u, INF):
+            key = self.key(u)
+            self.queued[u] = key
+            heapq.heappush(self.queue, (key, u))
+        else:
+            self.queued.pop(u, None)
+
+    def compute_shortest_path(self):
+        g, rhs, queue, queued = self.g, self.rhs, self.queue, self.queued
+        cells, adjacency = self.grid.cells, self.grid.adjacency
+        start = self.start
+        start_key = self.key(start)
+        expanded = 0
+        while True:
+            while queue and queued.get(queue[0][1]) != queue[0][0]:
+                heapq.heappop(queue)  # Stale entry
+            if not queue or not (queue[0][0] < start_key or rhs.get(start, INF) != g.get(start, INF)):
+                break
+            k_old, u = heapq.heappop(queue)
+            del queued[u]
+            expanded += 1
+            k_new = self.key(u)
+            if k_old < k_new:
+                queued[u] = k_new
+                heapq.heappush(queue, (k_new, u))
+                continue
+            neighbors = [p for p in adjacency[4 * u:4 * u + 4]
+                         if p != NO_CELL and (cells[p] == EMPTY or p == start)]
+            if g.get(u, INF) > rhs[u]:
+                # Overconsistent: lower g; a neighbor's rhs can only drop to
+                # g + 1 (if u can be entered at all), so it is lowered without
+                # rescanning the neighbor's own neighbors
+                g[u] = rhs[u]
+                cost = g[u] + 1 if cells[u] == EMPTY else INF
+                for p in neighbors:
+                    if cost < rhs.get(p, INF):
+                        rhs[p] = cost
+                        self.requeue(p)
+            else:
+                # Underconsistent: raise g and recheck it and its neighbors
+                g[u] = INF
+                self.update_vertex(u)
+                for p in neighbors:
+                    self.update_vertex(p)
+            if u == start or start in neighbors:
+                start_key = self.key(start)
+        self.game.nodes_expanded += expanded
+
+    def sync(self, head, tail):
+        """Bring the tree up to date with the board"""
+        food = self.grid.index(self.game.food)
+
+        if food != self.goal:
+            # New food: root a fresh tree at it
+            self.g.clear()
+            self.rhs.clear()
+            self.queue.clear()
+            self.queued.clear()
+            self.km = 0
+            self.goal = food
+            self.set_start(head)
+            self.tail = tail
+            self.rhs[food] = 0
+            self.update_vertex(food)
+            self.changed.clear()
+            return
+
+        # Head moved: shift the heuristic instead of re-keying the queue
+        if head != self.start:
+            self.km += self.heuristic(head)
+            self.set_start(head)
+
+        changed = self.changed
+        if tail != self.tail:
+            changed.add(self.tail)
+            changed.add(tail)
+            self.tail = tail
+
+        # A changed cell and its neighbors may now be reached differently
+        adjacency = self.grid.adjacency
+        for v in changed:
+            self.update_vertex(v)
+            for u in adjacency[4 * v:4 * v + 4]:
+                if u != NO_CELL:
+                    self.update_vertex(u)
+        changed.clear()
+
+        # Drop stale queue entries once they outnumber the live ones
+        if len(self.queue) > 2 * len(self.queued) + 64:
+            self.queue = [(key, u) for u, key in self.queued.items()]
+            heapq.heapify(self.queue)
+
+    def plan(self):
+        """Repair the tree and read the path to the food off it"""
+        grid = self.grid
+        snake = self.snake()
+        head, tail = grid.index(snake[0]), grid.index(snake[-1])
+        with grid.tail_vacated(tail):
+            self.sync(head, tail)
+            self.compute_shortest_path()
+
+            if self.rhs.get(head, INF) == INF:
+                return None  # Food not reachable
+
+            path = []
+            current = head
+            g, cells, adjacency = self.g, grid.cells, grid.adjacency
+            while current != self.goal and len(path) < self.size:
+                best = None
+                best_cost = INF
+                for v in adjacency[4 * current:4 * current + 4]:
+                    if v != NO_CELL and cells[v] == EMPTY and g.get(v, INF) + 1 < best_cost:
+                        best = v
+                        best_cost = g[v] + 1
+                if best is None:
+                    return None
+                current = best
+                path.append(grid.position(current))
+            return path
+
+def dstar_lite_search(game, is_ai=False):
+    if is_ai:
+        snake = game.ai_snake
+    else:
+        snake = game.snake
+
+    start = snake[0]  # Head of the snake
+    if start == game.food:
+        return []
+
+    # Reuse this snake's planner while the board it was built on is in play
+    planner = game.planners.get(is_ai)
+    if planner is None or planner.grid is not game.grid:
+        planner = DStarLitePlanner(game, is_ai)
+        game.planners[is_ai] = planner
+
+    path = planner.plan()
+
+    # If food was not found
+    if path is None:
+        # Try to find any safe move
+        grid = game.grid
+        for neighbor in grid.neighbors(grid.index(start)):
+            if neighbor != NO_CELL and grid.cells[neighbor] == EMPTY:
+                return [grid.position(neighbor)]
+        return []  # No safe moves
+
+    return path
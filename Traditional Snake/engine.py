@@ -0,0 +1,590 @@
+import random
+import time
+from collections import deque
+from grid import OccupancyGrid, EMPTY, OBSTACLE, PLAYER, AI
+from path_cache import PathCache
+from tail_check import TailCheck
+from bfs import bfs_search
+from dfs import dfs_search
+from bidirectional import bidirectional_search
+from astar import astar_search
+from greedy import greedy_search
+from dstar_lite import dstar_lite_search
+from hamiltonian import hamiltonian_search
+
+# Default board size in cells (fills the 800x800 window with 20px cells in gui.py)
+GRID_WIDTH = 40
+GRID_HEIGHT = 40
+
+# Simulation clock: move_cooldown is measured in frames of this rate
+FPS = 60
+FRAME_TIME = 1.0 / FPS
+
+# Most moves a single update() may catch up on; any backlog beyond that
+# (e.g. after the process was suspended) is dropped rather than replayed
+MAX_TICKS_PER_UPDATE = 100
+
+# Slack when checking whether a move is due: frame times such as 1/60 are
+# not exact in floating point, and without it a move due on a frame edge can
+# slip to the next frame, so the gaps between moves would jitter
+TIMESTEP_EPSILON = 1e-9
+
+# Safe mode chases the tail while the way to the food is unsafe; a snake
+# that has chased it for this many moves per board cell without eating has
+# stalled, and the game ends rather than circling forever
+STALL_LAPS = 2
+
+# Per difficulty: move cooldown in frames, bonus food chance, obstacles in
+# Classic mode and obstacles in the other modes (on the default board)
+DIFFICULTY_SETTINGS = {
+    'Easy': (7, 0.1, 0, 0),
+    'Normal': (5, 0.2, 0, 5),
+    'Hard': (3, 0.3, 3, 10),
+}
+
+# Pathfinding algorithms, in the order the algorithm button cycles through them
+ALGORITHMS = ["BFS", "DFS", "Bidirectional", "BFS-Vectorized", "A*", "Greedy", "D* Lite", "Hamiltonian"]
+
+# Game states
+IDLE = 0
+RUNNING = 1
+PAUSED = 2
+GAME_OVER = 3
+
+class SnakeEngine:
+    """Core game rules without any pygame or wall-clock dependency.
+
+    Time only advances when update() or step() is called, so a headless
+    caller can run games as fast as the CPU allows. All randomness goes
+    through self.rng, so a seeded engine replays the same game.
+    """
+    def __init__(self, two_player_mode=False, game_mode='Classic', difficulty='Normal',
+                 algorithm="BFS", seed=None, width=GRID_WIDTH, height=GRID_HEIGHT, safe_mode=False):
+        self.seed = seed
+        self.rng = random.Random(seed)
+
+        # Initialize algorithms
+        self.algorithms = list(ALGORITHMS)
+        self.current_algorithm = self.algorithms.index(algorithm)
+
+        # Initialize game options
+        self.two_player_mode = two_player_mode
+        self.game_mode = game_mode  # Classic, Challenge, Survival
+        self.difficulty = difficulty  # Easy, Normal, Hard
+
+        # Board size in cells
+        self.width = width
+        self.height = height
+
+        # Safe mode only follows a path if the snake can still reach its tail
+        # afterwards; the flood fill buffers are shared by every check
+        self.safe_mode = safe_mode
+        self.tail_check = TailCheck(width * height)
+
+        # Optional replay.ReplayWriter that every tick and food placement is reported to
+        self.recorder = None
+
+        # Optional snake_env.ObservationBuffer, kept in sync with the board the same way
+        self.observation = None
+
+        # Optional profiler.FrameProfiler that every find_path call is reported to
+        self.profiler = None
+
+        self.reset_game()
+
+    def reset_game(self):
+        # Game state
+        self.state = IDLE
+        self.score = 0
+        self.ai_score = 0
+        self.accumulator = 0.0  # Simulated time owed to the next move
+        self.steps = 0
+        self.death_cause = None
+        self.current_time = 0.0
+        self.pause_time = 0
+
+        # Moves each snake has spent chasing its tail in safe mode since it last ate
+        self.tail_chases = {False: 0, True: 0}
+
+        # Flag to track if manual input was received this frame
+        self.manual_input = False
+
+        # Set difficulty-based attributes (harder is faster, with more bonus food and obstacles)
+        (self.move_cooldown, self.bonus_food_chance,
+         classic_obstacles, other_obstacles) = DIFFICULTY_SETTINGS[self.difficulty]
+        self.num_obstacles = classic_obstacles if self.game_mode == 'Classic' else other_obstacles
+
+        # Occupancy of every cell, kept in sync with the snakes and obstacles
+        self.grid = OccupancyGrid(self.width, self.height)
+
+        # Snakes are deques (head first) so moving is O(1) at both ends;
+        # membership checks go through self.grid instead
+        self.snake = deque([(self.width // 4, self.height // 2)])
+        self.grid.set(self.snake[0], PLAYER)
+        self.direction = self.rng.choice([(1, 0), (0, 1), (-1, 0), (0, -1)])
+
+        # Initialize AI snake for two-player mode
+        self.ai_snake = deque()
+        self.ai_path = PathCache(self.grid)
+        if self.two_player_mode:
+            self.ai_snake.append((self.width * 3 // 4, self.height // 2))
+            self.ai_direction = self.rng.choice([(1, 0), (0, 1), (-1, 0), (0, -1)])
+            self.grid.set(self.ai_snake[0], AI)
+
+        # The observation planes follow the new grid from here on
+        if self.observation is not None:
+            self.observation.attach(self)
+
+        # Keep the obstacle density of the default board on other board sizes
+        self.num_obstacles = round(self.num_obstacles * self.width * self.height /
+                                   (GRID_WIDTH * GRID_HEIGHT))
+
+        # Create obstacles; they stay put all game, so moves into them are
+        # taken out of the grid's neighbour table once
+        self.obstacles = []
+        self.create_obstacles()
+        self.grid.fix_obstacles(self.obstacles)
+
+        # Place food
+        self.place_food()
+
+        # Path finding (consumed from the left, one cell per move)
+        self.path = PathCache(self.grid)
+
+        # Per-snake search state that incremental planners keep between ticks
+        self.planners = {}
+
+        # Time spent in find_path and cells the searches expanded, for comparing algorithms
+        self.searches = 0
+        self.search_time = 0.0
+        self.nodes_expanded = 0
+
+        # Score doubling mechanism
+        self.double_score_active = False
+        self.double_score_start_time = 0
+        self.double_score_duration = 10  # seconds
+
+        # Challenge mode timer
+        if self.game_mode == 'Challenge':
+            self.challenge_duration = 60  # 60 seconds for challenge mode
+            self.challenge_start_time = 0
+
+        # Survival mode properties
+        if self.game_mode == 'Survival':
+            self.survival_speed_increase = 0
+            self.survival_speed_threshold = 5  # Every 5 points, speed increases
+
+    def create_obstacles(self):
+        """Create obstacles based on difficulty and game mode"""
+        self.obstacles = []
+
+        # Skip obstacle creation for classic mode on easy difficulty
+        if self.game_mode == 'Classic' and self.difficulty == 'Easy':
+            return
+
+        # Create random obstacles on empty cells; only the few cells near the
+        # snake heads get rejected, so give up on an obstacle rather than spin
+        # forever on a board with no safe cell left
+        for _ in range(self.num_obstacles):
+            for _ in range(100):
+                obstacle = self.grid.random_free(self.rng)
+                if obstacle is None:
+                    return
+                # Make sure obstacles don't spawn too close to the snakes
+                if self.is_position_safe(obstacle):
+                    self.obstacles.append(obstacle)
+                    self.grid.set(obstacle, OBSTACLE)
+                    break
+
+    def is_position_safe(self, pos):
+        """Check if a position is safe to place an obstacle (not too close to snake heads)"""
+        pos_x, pos_y = pos
+        for snake in (self.snake, self.ai_snake):
+            if len(snake) > 0:
+                head_x, head_y = snake[0]
+                # Don't place obstacles within 3 units of a snake head
+                if abs(head_x - pos_x) <= 3 and abs(head_y - pos_y) <= 3:
+                    return False
+
+        return True
+
+    def place_food(self):
+        food = self.grid.random_free(self.rng)
+        if food is None:
+            # The snakes cover the whole board; nothing left to eat
+            self.end_game('board full')
+            return
+        self.food = food
+
+        # Random chance for bonus food
+        self.is_bonus_food = self.rng.random() < self.bonus_food_chance
+
+        if self.recorder is not None:
+            self.recorder.food_placed(self.food, self.is_bonus_food)
+        if self.observation is not None:
+            self.observation.food_placed(self.food)
+
+    def is_free(self, pos, snake):
+        """Check if snake can move onto pos: on the board and empty, or its own tail"""
+        grid = self.grid
+        with grid.tail_vacated(grid.index(snake[-1])):
+            return grid.is_free(pos)
+
+    def neighbor_indices(self, index, is_ai=False):
+        """Grid indices next to index (right, down, left, up) that the snake may move into"""
+        grid = self.grid
+        with grid.tail_vacated(grid.index(self.ai_snake[-1] if is_ai else self.snake[-1])):
+            return grid.open_neighbors(index)
+
+    def get_neighbors(self, pos, is_ai=False):
+        grid = self.grid
+        return [grid.position(neighbor) for neighbor in self.neighbor_indices(grid.index(pos), is_ai)]
+
+    def advance_snake(self, snake, next_pos, grow, owner):
+        """Move snake's head onto next_pos, keeping the grid in sync.
+
+        Returns what occupied next_pos after the tail moved away: EMPTY for
+        a normal move, otherwise the collision (see collision_cause).
+        """
+        if not grow:
+            # Remove tail
+            self.grid.set(snake.pop(), EMPTY)
+
+        hit = self.grid.get(next_pos)
+        snake.appendleft(next_pos)
+        if hit == EMPTY:
+            self.grid.set(next_pos, owner)
+        return hit
+
+    def collision_cause(self, hit, owner):
+        """Describe running into a cell holding hit (None for the wall)"""
+        prefix = 'AI ' if owner == AI else ''
+        if hit is None:
+            return prefix + 'wall'
+        elif hit == OBSTACLE:
+            return prefix + 'obstacle'
+        elif hit == owner:
+            return prefix + 'self'
+        return prefix + 'opponent'
+
+    def end_game(self, cause):
+        """Finish the game, remembering the first reason it ended"""
+        self.state = GAME_OVER
+        if self.death_cause is None:
+            self.death_cause = cause
+
+    def stall(self, is_ai=False):
+        """End a game the snake can make no more progress in (it would circle forever)"""
+        self.end_game('AI stalled' if is_ai else 'stalled')
+
+    def find_path(self, is_ai=False):
+        """Find path using selected algorithm, timing the search"""
+        start = time.perf_counter()
+        nodes = self.nodes_expanded
+        try:
+            path = self.search(is_ai)
+            if self.safe_mode and path:
+                path = self.make_safe(path, is_ai)
+            return path
+        finally:
+            elapsed = time.perf_counter() - start
+            self.searches += 1
+            self.search_time += elapsed
+            if self.profiler is not None:
+                self.profiler.search_done(elapsed, self.nodes_expanded - nodes)
+
+    def make_safe(self, path, is_ai=False):
+        """Keep path if the snake can reach its tail after following it, else chase the tail"""
+        snake, owner = (self.ai_snake, AI) if is_ai else (self.snake, PLAYER)
+        if self.tail_check.tail_reachable_after(self.grid, snake, path, self.food, owner):
+            return path
+
+        # Following the tail keeps a way out open until the food is safe to take;
+        # one move at a time, so the food path is checked again next move
+        self.tail_chases[is_ai] += 1
+        if self.tail_chases[is_ai] > STALL_LAPS * self.width * self.height:
+            self.stall(is_ai)
+            return []
+        tail_path = self.tail_check.path_to_tail(self.grid, snake)
+        if tail_path:
+            return tail_path[:1]
+        return path
+
+    def search(self, is_ai=False):
+        if self.algorithms[self.current_algorithm] == "BFS":
+            return bfs_search(self, is_ai)
+        elif self.algorithms[self.current_algorithm] == "DFS":
+            return dfs_search(self, is_ai)
+        elif self.algorithms[self.current_algorithm] == "Bidirectional":
+            return bidirectional_search(self, is_ai)
+        elif self.algorithms[self.current_algorithm] == "BFS-Vectorized":
+            # Imported here so games that never use it don't pay for loading NumPy
+            from bfs_vectorized import bfs_vectorized_search
+            return bfs_vectorized_search(self, is_ai)
+        elif self.algorithms[self.current_algorithm] == "A*":
+            return astar_search(self, is_ai)
+        elif self.algorithms[self.current_algorithm] == "Greedy":
+            return greedy_search(self, is_ai)
+        elif self.algorithms[self.current_algorithm] == "D* Lite":
+            return dstar_lite_search(self, is_ai)
+        elif self.algorithms[self.current_algorithm] == "Hamiltonian":
+            return hamiltonian_search(self, is_ai)
+
+    def start(self):
+        """Start (or resume) the game, keeping the challenge timer in sync"""
+        if self.state == IDLE:
+            self.state = RUNNING
+            if self.game_mode == 'Challenge':
+                self.challenge_start_time = self.current_time
+        elif self.state == PAUSED:
+            self.state = RUNNING
+            if self.game_mode == 'Challenge':
+                # Adjust challenge start time to account for pause duration
+                self.challenge_start_time += (self.current_time - self.pause_time)
+
+    def move_player(self):
+        """Move the player snake based on keyboard input or AI path"""
+        # Get next move from path or calculate new path
+        if self.path.needs_replan(self.food):
+            self.path.replace(self.find_path(), self.food)
+            if self.state != RUNNING:
+                return  # The search gave up on a stalled game
+
+            # If no path found, try to find any safe move
+            if not self.path:
+                moves = self.neighbor_indices(self.grid.index(self.snake[0]))
+                if moves:
+                    self.path.replace([self.grid.position(moves[0])], self.food)
+
+                # If still no path, game over
+                if not self.path:
+                    self.end_game('trapped')
+                    return
+
+        # Get next position from path
+        next_pos = self.path.popleft()
+
+        # Check if next position is valid
+        head_x, head_y = self.snake[0]
+        next_x, next_y = next_pos
+
+        # Calculate direction vector
+        dx, dy = next_x - head_x, next_y - head_y
+        self.direction = (dx, dy)
+
+        # Move snake, checking for collision with self, AI snake, or obstacles
+        ate_food = next_pos == self.food
+        hit = self.advance_snake(self.snake, next_pos, ate_food, PLAYER)
+        if hit != EMPTY:
+            self.end_game(self.collision_cause(hit, PLAYER))
+
+        # Check if food was eaten
+        if ate_food:
+            score_increment = 2 if self.is_bonus_food else 1
+
+            # Double score if feature is active
+            if self.double_score_active:
+                score_increment *= 2
+
+            self.score += score_increment
+            self.tail_chases[False] = 0
+            self.place_food()
+
+            # Generate new path
+            self.path.clear()
+
+            # Activate double scoring after score reaches threshold
+            if self.score >= 10 and not self.double_score_active:
+                self.double_score_active = True
+                self.double_score_start_time = self.current_time
+
+            # Survival mode speed increase
+            if self.game_mode == 'Survival':
+                if self.score // self.survival_speed_threshold > self.survival_speed_increase:
+                    self.survival_speed_increase = self.score // self.survival_speed_threshold
+                    self.move_cooldown = max(1, self.move_cooldown - 0.5)
+
+    def move_ai(self):
+        """Move the AI snake"""
+        # Replan only when the cached path is used up or was invalidated,
+        # e.g. the player's head moved onto it or the player ate the food
+        if self.ai_path.needs_replan(self.food):
+            self.ai_path.replace(self.find_path(is_ai=True), self.food)
+            if self.state != RUNNING:
+                return  # The search gave up on a stalled game
+
+            # If no path found, try to find any safe move
+            if not self.ai_path:
+                moves = self.neighbor_indices(self.grid.index(self.ai_snake[0]), is_ai=True)
+                if moves:
+                    self.ai_path.replace([self.grid.position(moves[0])], self.food)
+
+                # If still no path, AI loses
+                if not self.ai_path:
+                    if self.two_player_mode:
+                        self.end_game('AI trapped')
+                    return
+
+        # Get next position from path
+        next_pos = self.ai_path.popleft()
+
+        # Calculate direction
+        head_x, head_y = self.ai_snake[0]
+        next_x, next_y = next_pos
+        self.ai_direction = (next_x - head_x, next_y - head_y)
+
+        # Move AI snake, checking for collision
+        ate_food = next_pos == self.food
+        hit = self.advance_snake(self.ai_snake, next_pos, ate_food, AI)
+        if hit != EMPTY:
+            if self.two_player_mode:
+                self.end_game(self.collision_cause(hit, AI))
+
+        # Check if food was eaten
+        if ate_food:
+            score_increment = 2 if self.is_bonus_food else 1
+            self.ai_score += score_increment
+            self.tail_chases[True] = 0
+            self.place_food()
+            self.ai_path.clear()
+
+    def move_manual(self):
+        """Move the player snake one cell in self.direction (keyboard control)"""
+        # Get next position based on direction
+        head_x, head_y = self.snake[0]
+        dx, dy = self.direction
+        next_pos = (head_x + dx, head_y + dy)
+
+        # Check if next position is valid
+        if self.is_free(next_pos, self.snake):
+
+            # Move snake
+            ate_food = next_pos == self.food
+            self.advance_snake(self.snake, next_pos, ate_food, PLAYER)
+
+            # A planned path no longer starts next to the head
+            self.path.clear()
+
+            # Check if food was eaten
+            if ate_food:
+                score_increment = 2 if self.is_bonus_food else 1
+                if self.double_score_active:
+                    score_increment *= 2
+                self.score += score_increment
+                self.place_food()
+        else:
+            # Collision occurred
+            hit = self.grid.get(next_pos) if self.grid.in_bounds(next_pos) else None
+            self.end_game(self.collision_cause(hit, PLAYER))
+
+    def update_timers(self):
+        """Expire the challenge timer and the double score bonus"""
+        # Check challenge mode timer
+        if (self.state == RUNNING and self.game_mode == 'Challenge' and
+            self.current_time - self.challenge_start_time >= self.challenge_duration):
+            self.end_game('time up')
+
+        # Update double score timer
+        if self.double_score_active:
+            if self.current_time - self.double_score_start_time > self.double_score_duration:
+                self.double_score_active = False
+
+    def tick(self):
+        """Perform one move of both snakes"""
+        self.steps += 1
+        player_head = self.snake[0]
+        ai_head = self.ai_snake[0] if self.ai_snake else None
+
+        if self.two_player_mode:
+            # In two-player mode, manually control player snake, then move the AI snake
+            self.move_manual()
+            self.move_ai()
+        elif self.manual_input:
+            # In one-player mode, apply manual control if it was used; a key
+            # press steers one move, even when an update catches up on several
+            self.move_manual()
+            self.manual_input = False
+        else:
+            # Use AI if no manual control
+            self.move_player()
+
+        if self.recorder is not None:
+            self.recorder.record_tick(self, player_head, ai_head)
+        if self.observation is not None:
+            self.observation.heads_moved(self)
+
+    def move_interval(self):
+        """Seconds between moves (move_cooldown frames, which may be fractional)"""
+        return self.move_cooldown * FRAME_TIME
+
+    def update(self, now=None):
+        """Advance the simulation clock to now, moving once per elapsed move interval.
+
+        now defaults to one frame after the last update. Moves run on a fixed
+        timestep: elapsed time is collected in self.accumulator and each move
+        spends one move_interval() of it, so the move rate does not depend on
+        how often update() is called.
+        """
+        if now is None:
+            now = self.current_time + FRAME_TIME
+
+        # Store pause time for adjusting challenge timer
+        if self.state == PAUSED:
+            self.pause_time = now
+
+        if self.state == RUNNING:
+            self.accumulator += now - self.current_time
+            ticks = 0
+            while self.state == RUNNING and self.accumulator + TIMESTEP_EPSILON >= self.move_interval():
+                if ticks == MAX_TICKS_PER_UPDATE:
+                    self.accumulator = 0.0
+                    break
+                # Run the move at the time it was due, so timers expire between the right moves
+                self.accumulator -= self.move_interval()
+                self.current_time = now - self.accumulator
+                self.update_timers()
+                if self.state == RUNNING:
+                    self.tick()
+                ticks += 1
+
+        self.current_time = now
+        self.update_timers()
+
+    def step(self):
+        """Advance straight to the next move, skipping the frames in between (headless runs)"""
+        self.current_time += self.move_interval()
+        self.accumulator = 0.0
+        self.update_timers()
+        if self.state == RUNNING:
+            self.tick()
+
+    def play(self, max_steps=None):
+        """Run a whole game headlessly and return the final score"""
+        self.start()
+        while self.state == RUNNING:
+            if max_steps is not None and self.steps >= max_steps:
+                self.end_game('step limit')
+                break
+            self.step()
+        return self.score
+
+    def result(self):
+        """Summary of the current game as a plain dict"""
+        return {
+            'algorithm': self.algorithms[self.current_algorithm],
+            'game_mode': self.game_mode,
+            'difficulty': self.difficulty,
+            'two_player_mode': self.two_player_mode,
+            'safe_mode': self.safe_mode,
+            'width': self.width,
+            'height': self.height,
+            'seed': self.seed,
+            'score': self.score,
+            'ai_score': self.ai_score,
+            'length': len(self.snake),
+            'steps': self.steps,
+            'death_cause': self.death_cause,
+            'searches': self.searches,
+            'search_time': self.search_time,
+            'nodes_expanded': self.nodes_expanded,
+        }
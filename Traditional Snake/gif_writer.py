@@ -0,0 +1,110 @@
+import os
+import threading
+from PIL import Image, ImageChops, GifImagePlugin
+
+def build_palette(colors=()):
+    """256-colour palette: the given exact colours, then a 6x6x6 colour cube"""
+    palette = []
+    for color in colors:
+        palette.extend(color)
+    for r in range(6):
+        for g in range(6):
+            for b in range(6):
+                palette.extend((r * 51, g * 51, b * 51))
+    palette = palette[:768]
+    return palette + [0] * (768 - len(palette))
+
+class StreamingGifWriter:
+    """Encodes frames into an animated GIF file as they arrive.
+
+    Each frame is LZW-encoded straight into the file, so memory use stays
+    flat however many frames are written. Frames already in palette mode
+    are written as they are; anything else is quantized to the palette.
+    After the first frame only the rectangle that changed since the
+    previous frame is encoded, which is usually a few cells of the board.
+    """
+    def __init__(self, path, size, duration_ms, palette):
+        self.size = size
+        self.duration_ms = duration_ms
+        self.palette = palette
+        self.palette_image = Image.new('P', (1, 1))
+        self.palette_image.putpalette(palette)
+        self.frame_count = 0
+        self.previous = None  # Palette indices of the last frame, as an 'L' image
+        self.file = open(path, 'wb')
+
+    def add_frame(self, frame):
+        """Append one frame (a PIL image of self.size)"""
+        if frame.mode != 'P':
+            frame = frame.convert('RGB').quantize(palette=self.palette_image, dither=Image.Dither.NONE)
+
+        indices = Image.frombytes('L', frame.size, frame.tobytes())
+        offset = (0, 0)
+        if self.frame_count == 0:
+            header, _ = GifImagePlugin.getheader(frame, self.palette, {'loop': 0})
+            for chunk in header:
+                self.file.write(chunk)
+        else:
+            # Draw only the changed rectangle over the previous frame
+            box = ImageChops.difference(indices, self.previous).getbbox() or (0, 0, 1, 1)
+            frame = frame.crop(box)
+            offset = box[:2]
+        for chunk in GifImagePlugin.getdata(frame, offset, duration=self.duration_ms,
+                                            disposal=1, optimize=False):
+            self.file.write(chunk)
+        self.previous = indices
+        self.frame_count += 1
+
+    def close(self):
+        """Finish the GIF and close the file"""
+        self.file.write(b';')  # GIF trailer
+        self.file.close()
+
+class ExportJob:
+    """Runs an export on a background thread.
+
+    work(path) writes the output to path and yields its progress, from 0 to
+    1, as it goes. It writes to a .part file that is renamed to filename
+    once complete; cancel() stops the work at its next step, and the partial
+    file is removed after a cancel or an error.
+    """
+    def __init__(self, work, filename):
+        self.work = work
+        self.filename = filename
+        self.progress = 0.0
+        self.done = False
+        self.error = None
+        self.cancelled = threading.Event()
+
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def run(self):
+        partial = self.filename + '.part'
+        try:
+            steps = self.work(partial)
+            try:
+                for progress in steps:
+                    self.progress = progress
+                    if self.cancelled.is_set():
+                        break
+            finally:
+                steps.close()  # Lets the work close its files
+            if self.cancelled.is_set():
+                os.remove(partial)
+            else:
+                os.replace(partial, self.filename)
+        except Exception as e:
+            # Reported to whoever polls the job instead of dying with the thread
+            self.error = e
+            try:
+                os.remove(partial)
+            except OSError:
+                pass  # The work failed before creating it
+        self.done = True
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def wait(self):
+        self.thread.join()
@@ -0,0 +1,58 @@
+import heapq
+from grid import EMPTY, NO_CELL
+from astar import manhattan
+
+def greedy_search(game, is_ai=False):
+    if is_ai:
+        snake = game.ai_snake
+    else:
+        snake = game.snake
+        
+    start = snake[0]  # Head of the snake
+    goal = game.food
+    if start == goal:
+        return []
+    
+    # Cells are grid indices, with moves read from the grid's neighbour table
+    grid = game.grid
+    width, height, cells, adjacency = grid.width, grid.height, grid.cells, grid.adjacency
+    source, target = grid.index(start), grid.index(goal)
+    goal_x, goal_y = goal
+    
+    # Greedy best-first: always expand the cell closest to the food (ties go
+    # to the leftmost, topmost cell: x * height + y orders cells like (x, y)).
+    # Expands very few cells, but the path is not guaranteed to be shortest.
+    open_set = [(manhattan(start, goal), start[0] * height + start[1], source)]
+    visited = {source: None}
+    expanded = 0
+    
+    with grid.tail_vacated(grid.index(snake[-1])):
+        while open_set:
+            _, _, current = heapq.heappop(open_set)
+            expanded += 1
+        
+            if current == target:
+                break
+            
+            for neighbor in adjacency[4 * current:4 * current + 4]:
+                if neighbor not in visited and neighbor != NO_CELL and cells[neighbor] == EMPTY:
+                    visited[neighbor] = current
+                    y, x = divmod(neighbor, width)
+                    heapq.heappush(open_set, (abs(x - goal_x) + abs(y - goal_y), x * height + y, neighbor))
+    game.nodes_expanded += expanded
+    
+    # If food was not found
+    if target not in visited:
+        # Try to find any safe move (an empty path if there is none)
+        return [grid.position(neighbor) for neighbor in grid.open_neighbors(source)[:1]]
+        
+    # Reconstruct path
+    path = []
+    current = target
+    
+    while current != source:
+        path.append(grid.position(current))
+        current = visited[current]
+        
+    path.reverse()
+    return path
@@ -0,0 +1,150 @@
+from array import array
+from contextlib import contextmanager
+from functools import lru_cache
+
+# Cell contents
+EMPTY = 0
+OBSTACLE = 1
+PLAYER = 2
+AI = 3
+
+# Neighbour table entry for a move off the board or into an obstacle
+NO_CELL = -1
+
+@lru_cache(maxsize=4)
+def board_adjacency(width, height):
+    """Neighbour table of an obstacle-free board, shared by every grid of that size.
+
+    Entry 4 * index + k is the cell one move from index in direction k
+    (right, down, left, up), or NO_CELL past the edge of the board. Built
+    with array slicing, in a fraction of a second even for 1000x1000.
+    Shared: never modify it.
+    """
+    size = width * height
+    wall = array('i', [NO_CELL])
+    # Every move adds a fixed offset to the index: slice each one out of a
+    # single run of indices, then wall off the edge it crosses
+    indices = array('i', range(-width, size + width))
+    right = indices[width + 1:width + 1 + size]
+    right[width - 1::width] = wall * height
+    down = indices[2 * width:2 * width + size]
+    down[size - width:] = wall * width
+    left = indices[width - 1:width - 1 + size]
+    left[::width] = wall * height
+    up = indices[:size]
+    up[:width] = wall * width
+
+    table = wall * (4 * size)
+    for direction, moves in enumerate((right, down, left, up)):
+        table[direction::4] = moves
+    return table
+
+class OccupancyGrid:
+    """What occupies each board cell, stored in a flat bytearray.
+
+    Cells are indexed by y * width + x. The engine updates the grid on every
+    head insert and tail pop, so membership checks are O(1) instead of
+    scanning the snake and obstacle lists.
+
+    The grid also keeps every empty cell in self.free, with self.slot giving
+    each cell's position in that list (-1 when occupied). Cells are added and
+    swap-removed in O(1), so a random empty cell can be drawn in O(1) however
+    full the board is.
+
+    Callables in self.listeners are called with the cell index whenever a
+    cell's contents change, so incremental consumers (planners, caches) can
+    track exactly what moved.
+
+    self.adjacency is the flat neighbour table the searches walk (see
+    board_adjacency); once fix_obstacles() has run, moves into obstacles
+    read NO_CELL too.
+    """
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.cells = bytearray(width * height)
+        self.free = array('i', range(width * height))
+        self.slot = array('i', range(width * height))
+        self.listeners = []
+        self.adjacency = board_adjacency(width, height)
+
+    def fix_obstacles(self, obstacles):
+        """Drop moves into obstacles (fixed for the rest of the game) from the neighbour table"""
+        if not obstacles:
+            return
+        table = array('i', board_adjacency(self.width, self.height))
+        for pos in obstacles:
+            index = self.index(pos)
+            for direction, neighbor in enumerate(table[4 * index:4 * index + 4]):
+                if neighbor != NO_CELL:
+                    # The move back from neighbor is the opposite direction
+                    table[4 * neighbor + (direction + 2) % 4] = NO_CELL
+        self.adjacency = table
+
+    def neighbors(self, index):
+        """The four table entries of index: right, down, left, up (NO_CELL if blocked)"""
+        return self.adjacency[4 * index:4 * index + 4]
+
+    def open_neighbors(self, index):
+        """Empty cells next to index"""
+        cells = self.cells
+        return [neighbor for neighbor in self.adjacency[4 * index:4 * index + 4]
+                if neighbor != NO_CELL and cells[neighbor] == EMPTY]
+
+    @contextmanager
+    def tail_vacated(self, tail):
+        """Treat the cell at index tail as empty inside the with block.
+
+        A snake may move into its own tail, which moves away this tick, so
+        the searches run inside this block and only need to check for empty
+        cells. Only the cell's byte changes (no free list update, no
+        listeners), and it is restored on exit.
+        """
+        value = self.cells[tail]
+        self.cells[tail] = EMPTY
+        try:
+            yield
+        finally:
+            self.cells[tail] = value
+
+    def index(self, pos):
+        return pos[1] * self.width + pos[0]
+
+    def position(self, index):
+        return (index % self.width, index // self.width)
+
+    def in_bounds(self, pos):
+        return 0 <= pos[0] < self.width and 0 <= pos[1] < self.height
+
+    def get(self, pos):
+        return self.cells[pos[1] * self.width + pos[0]]
+
+    def set(self, pos, value):
+        index = pos[1] * self.width + pos[0]
+        if self.cells[index] == value:
+            return
+        if (self.cells[index] == EMPTY) != (value == EMPTY):
+            if value == EMPTY:
+                self.slot[index] = len(self.free)
+                self.free.append(index)
+            else:
+                # Swap-remove: move the last free cell into this cell's slot
+                last = self.free.pop()
+                if last != index:
+                    self.free[self.slot[index]] = last
+                    self.slot[last] = self.slot[index]
+                self.slot[index] = -1
+        self.cells[index] = value
+        for listener in self.listeners:
+            listener(index)
+
+    def random_free(self, rng):
+        """Return a random empty position, or None if the board is full"""
+        if not self.free:
+            return None
+        index = self.free[rng.randrange(len(self.free))]
+        return (index % self.width, index // self.width)
+
+    def is_free(self, pos):
+        """Check if a position is on the board and not occupied"""
+        return self.in_bounds(pos) and self.get(pos) == EMPTY
@@ -1,34 +1,75 @@
+import os
 import pygame
 from datetime import datetime
-from PIL import Image
+from functools import lru_cache
+from engine import IDLE, RUNNING, PAUSED, GAME_OVER
 
-# Initialize Pygame
-pygame.init()
+# Pygame's display and font modules are initialized when first needed (by
+# GameRenderer and get_font), so importing this module for its colours or
+# running headless costs no pygame setup
 
 # Constants
 WIDTH, HEIGHT = 800, 800
-GRID_SIZE = 20
-GRID_WIDTH = WIDTH // GRID_SIZE
-GRID_HEIGHT = HEIGHT // GRID_SIZE
+GRID_SIZE = 20  # Cell size in pixels of the default 40x40 board
+MIN_CELL_SIZE = 4  # Boards that would need smaller cells scroll instead
 WHITE = (255, 255, 255)
 BLACK = (0, 0, 0)
 RED = (255, 0, 0)
 GREEN = (0, 255, 0)
 BLUE = (0, 0, 255)
+DARK_BLUE = (0, 0, 150)
 GRAY = (169, 169, 169)
 DARK_RED = (150, 0, 0)
 YELLOW = (255, 255, 0)
 BUTTON_COLOR = (100, 100, 200)
 BUTTON_HOVER_COLOR = (120, 120, 220)
 BUTTON_TEXT_COLOR = (255, 255, 255)
-FONT = pygame.font.SysFont('Arial', 24)
-SMALL_FONT = pygame.font.SysFont('Arial', 18)
 
-# Game states
-IDLE = 0
-RUNNING = 1
-PAUSED = 2
-GAME_OVER = 3
+# Font sizes of the UI text (see get_font)
+FONT = 24
+SMALL_FONT = 18
+FONT_NAME = 'Arial'
+
+# Finding the font file scans the system's fonts, which is slow, so the path
+# found is remembered here for later runs
+FONT_PATH_CACHE = os.path.join(os.path.expanduser('~'), '.cache', 'traditional-snake-font-path')
+
+@lru_cache(maxsize=1)
+def font_path():
+    """Path of the UI font file, or None for pygame's default font"""
+    try:
+        with open(FONT_PATH_CACHE) as f:
+            path = f.read().strip()
+        if os.path.exists(path):
+            return path
+    except OSError:
+        pass
+
+    path = pygame.font.match_font(FONT_NAME)
+    if path:
+        try:
+            os.makedirs(os.path.dirname(FONT_PATH_CACHE), exist_ok=True)
+            with open(FONT_PATH_CACHE, 'w') as f:
+                f.write(path)
+        except OSError:
+            pass  # Read-only home: look the font up again next time
+    return path
+
+@lru_cache(maxsize=None)
+def get_font(size):
+    """The UI font at size, loaded on first use"""
+    if not pygame.font.get_init():
+        pygame.font.init()
+    return pygame.font.Font(font_path(), size)
+
+@lru_cache(maxsize=256)
+def render_text(size, text, color):
+    """Rendered text, cached by (font size, text, color) with least-recently-used eviction.
+
+    Labels and scores repeat from frame to frame, so most calls are cache
+    hits; ticking timers only add a new entry every tenth of a second.
+    """
+    return get_font(size).render(text, True, color)
 
 class Button:
     def __init__(self, x, y, width, height, text):
@@ -43,7 +84,7 @@ class Button:
         pygame.draw.rect(screen, color, self.rect, border_radius=5)
         pygame.draw.rect(screen, WHITE, self.rect, 2, border_radius=5)
         
-        text_surface = self.font.render(self.text, True, BUTTON_TEXT_COLOR)
+        text_surface = render_text(self.font, self.text, BUTTON_TEXT_COLOR)
         text_rect = text_surface.get_rect(center=self.rect.center)
         screen.blit(text_surface, text_rect)
         
@@ -53,6 +94,7 @@ class Button:
 class GameRenderer:
     def __init__(self, game_state):
         self.game_state = game_state
+        pygame.display.init()
         self.screen = pygame.display.set_mode((WIDTH, HEIGHT))
         pygame.display.set_caption("Snake Game with AI")
         
@@ -71,249 +113,390 @@ class GameRenderer:
         # Difficulty buttons
         self.difficulty_button = Button(WIDTH - 120, 130, 110, 30, "Normal")
         
-        # Screenshots for GIF creation
-        self.screenshots = []
-        self.last_screenshot_time = 0
-        self.screenshot_interval = 0.2  # seconds
+        # GIF rendered from the game's replay file in the background
+        self.export = None  # ExportJob of the GIF being saved, if any
+        self.export_message = None
+        
+        # Incremental drawing: obstacles live on a cached background, and
+        # each frame only redraws cells whose contents changed plus the UI
+        self.background = None
+        self.background_grid = None
+        self.layers = {}  # cell -> what was drawn there last frame
+        self.ui_rects = []  # where the UI was drawn last frame
+        self.full_redraw = True
+        
+        # Viewport: the board is scaled to fit the window, down to
+        # MIN_CELL_SIZE pixels per cell; larger boards scroll with the player
+        self.cell_size = None
+        self.view = pygame.Rect(0, 0, 0, 0)  # Visible cells
+    
+    def configure_view(self):
+        """Fit the viewport to a new board and build the sprites for its cell size"""
+        grid = self.game_state.grid
+        cell_size = max(MIN_CELL_SIZE, min(WIDTH // grid.width, HEIGHT // grid.height))
+        self.view = pygame.Rect(0, 0, min(grid.width, WIDTH // cell_size),
+                                min(grid.height, HEIGHT // cell_size))
+        if cell_size != self.cell_size:
+            self.cell_size = cell_size
+            self.build_sprites()
+    
+    def build_sprites(self):
+        """Pre-render snake heads and path markers at the current cell size"""
+        size = self.cell_size
+        
+        # Snake heads (eyes included) for each color and direction
+        self.head_sprites = {}
+        for color in (DARK_RED, DARK_BLUE):
+            for direction in [(1, 0), (0, 1), (-1, 0), (0, -1)]:
+                sprite = pygame.Surface((size, size))
+                sprite.fill(color)
+                self.draw_snake_eyes(sprite, 0, 0, direction)
+                self.head_sprites[(color, direction)] = sprite
+        
+        # Path markers for every fade level cell_layers uses
+        self.path_markers = {}
+        for i in range(16):
+            alpha = 200 - min(i * 10, 150)
+            marker = pygame.Surface((size // 2, size // 2))
+            marker.set_alpha(alpha)
+            marker.fill(BLUE)
+            self.path_markers[alpha] = marker
+    
+    def follow(self, pos):
+        """Scroll the viewport to center pos once it gets near an edge; True if it moved"""
+        grid = self.game_state.grid
+        view = self.view.copy()
+        # Each axis scrolls on its own, a page at a time, so the board does not
+        # slide under the player on every move
+        margin_x, margin_y = view.width // 4, view.height // 4
+        if not view.left + margin_x <= pos[0] < view.right - margin_x:
+            view.centerx = pos[0]
+        if not view.top + margin_y <= pos[1] < view.bottom - margin_y:
+            view.centery = pos[1]
+        view.clamp_ip(pygame.Rect(0, 0, grid.width, grid.height))
+        if view == self.view:
+            return False
+        self.view = view
+        return True
+    
+    def cell_rect(self, cell):
+        """Screen rect of a board cell (which may be outside the viewport)"""
+        size = self.cell_size
+        return pygame.Rect((cell[0] - self.view.x) * size, (cell[1] - self.view.y) * size, size, size)
     
     def update_game_state(self, game_state):
         self.game_state = game_state
     
-    def take_screenshot(self, current_time):
-        if current_time - self.last_screenshot_time >= self.screenshot_interval:
-            pygame_surface = pygame.Surface((WIDTH, HEIGHT))
-            pygame_surface.blit(self.screen, (0, 0))
-            pygame_array = pygame.surfarray.array3d(pygame_surface)
-            pygame_array = pygame_array.transpose([1, 0, 2])
-            self.screenshots.append(pygame_array)
-            self.last_screenshot_time = current_time
-    
     def save_gif(self):
-        if not self.screenshots:
+        """Start saving the replay in the background, or cancel a save in progress"""
+        if self.export is not None:
+            self.export.cancel()
+            return
+        recorder = getattr(self.game_state, 'recorder', None)
+        if recorder is None:
             return
             
         timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
         filename = f"snake_replay_{timestamp}.gif"
         
         print(f"Saving GIF to {filename}...")
-        
-        # Convert screenshots to PIL Images
-        images = [Image.fromarray(screenshot) for screenshot in self.screenshots]
-        
-        # Save as GIF
-        images[0].save(
-            filename,
-            save_all=True,
-            append_images=images[1:],
-            duration=self.screenshot_interval * 1000,  # milliseconds
-            loop=0
-        )
-        
-        print(f"GIF saved to {filename}")
+        # Imported here: the renderer reuses this module's colours, and PIL is
+        # only loaded once a GIF is actually saved
+        from render_replay import render_gif
+        from gif_writer import ExportJob
+        recorder.flush()
+        # The GIF shows the whole board, scaled to about the window size
+        grid = self.game_state.grid
+        cell_size = max(1, min(WIDTH // grid.width, HEIGHT // grid.height))
+        self.export = ExportJob(lambda path: render_gif(recorder.path, path, cell_size), filename)
+        self.export_message = None
+        self.gif_button.text = "Cancel GIF Export"
+    
+    def check_export(self):
+        """Report a finished background export and reset the GIF button"""
+        if self.export is None or not self.export.done:
+            return
+        if self.export.error is not None:
+            self.export_message = f"GIF export failed: {self.export.error}"
+        elif self.export.cancelled.is_set():
+            self.export_message = "GIF export cancelled"
+        else:
+            self.export_message = f"GIF saved to {self.export.filename}"
+        print(self.export_message)
+        self.export = None
+        self.gif_button.text = "Save GIF Replay"
     
-    def draw_grid(self):
+    def close(self):
+        """Stop any export in progress"""
+        if self.export is not None:
+            self.export.cancel()
+            self.export.wait()
+            self.export = None
+    
+    def draw_grid(self, surface):
         """Draw a grid on the game board for better visibility"""
         # Grid has been removed
         pass
     
-    def draw_obstacles(self):
-        """Draw obstacles on the game board"""
+    def draw_obstacles(self, surface):
+        """Draw the obstacles inside the viewport"""
         for obstacle in self.game_state.obstacles:
-            obstacle_rect = pygame.Rect(
-                obstacle[0] * GRID_SIZE, 
-                obstacle[1] * GRID_SIZE, 
-                GRID_SIZE, GRID_SIZE
-            )
-            pygame.draw.rect(self.screen, GRAY, obstacle_rect)
+            if self.view.collidepoint(obstacle):
+                pygame.draw.rect(surface, GRAY, self.cell_rect(obstacle))
+    
+    def draw_background(self):
+        """Cache the static layer of the board: background, grid and obstacles"""
+        self.background = pygame.Surface((WIDTH, HEIGHT))
+        self.background.fill(BLACK)
+        self.draw_grid(self.background)
+        if hasattr(self.game_state, 'obstacles'):
+            self.draw_obstacles(self.background)
+        self.background_grid = self.game_state.grid
     
-    def draw_food(self):
-        """Draw food with different colors for special foods"""
-        food_rect = pygame.Rect(
-            self.game_state.food[0] * GRID_SIZE, 
-            self.game_state.food[1] * GRID_SIZE, 
-            GRID_SIZE, GRID_SIZE
-        )
+    def cell_layers(self):
+        """What is drawn over the background in each cell, bottom layer first"""
+        layers = {}
+        
+        def add(cell, layer):
+            layers[cell] = layers.get(cell, ()) + (layer,)
         
         # Different color for special food (bonus food)
         if hasattr(self.game_state, 'is_bonus_food') and self.game_state.is_bonus_food:
-            pygame.draw.rect(self.screen, YELLOW, food_rect)
+            add(self.game_state.food, ('cell', YELLOW))
         else:
-            pygame.draw.rect(self.screen, GREEN, food_rect)
+            add(self.game_state.food, ('cell', GREEN))
+        
+        # Player snake: Dark red head, red body
+        snakes = [(self.game_state.snake, RED, DARK_RED, self.game_state.direction)]
+        
+        # AI snake in 2P mode: Dark blue head, blue body
+        if hasattr(self.game_state, 'two_player_mode') and self.game_state.two_player_mode:
+            if hasattr(self.game_state, 'ai_snake'):
+                snakes.append((self.game_state.ai_snake, BLUE, DARK_BLUE, self.game_state.ai_direction))
+        
+        for snake, color, head_color, direction in snakes:
+            for i, cell in enumerate(snake):
+                if i == 0:
+                    add(cell, ('head', head_color, direction))
+                else:
+                    add(cell, ('cell', color))
+        
+        # AI path with fading effect
+        if self.game_state.state in [RUNNING, PAUSED] and hasattr(self.game_state, 'path'):
+            for i, cell in enumerate(self.game_state.path):
+                alpha = 200 - min(i * 10, 150)  # Fade out based on distance
+                add(cell, ('path', alpha))
+        
+        return layers
     
-    def draw_snake(self, snake, is_player=True):
-        """Draw the snake with smooth transitions and different colors for player/AI"""
-        for i, (x, y) in enumerate(snake):
-            snake_rect = pygame.Rect(x * GRID_SIZE, y * GRID_SIZE, GRID_SIZE, GRID_SIZE)
-            
-            if is_player:
-                # Player snake: Dark red head, red body
-                color = RED if i > 0 else DARK_RED
+    def draw_cell(self, cell, layers):
+        """Redraw one cell from the background up and return its rect (None when out of view)"""
+        if not self.view.collidepoint(cell):
+            return None
+        cell_rect = self.cell_rect(cell)
+        
+        # Food and snake cells cover the whole cell; only path markers show what is underneath
+        if not layers or layers[0][0] == 'path':
+            self.screen.blit(self.background, cell_rect, cell_rect)
+        
+        for layer in layers:
+            if layer[0] == 'cell':
+                pygame.draw.rect(self.screen, layer[1], cell_rect)
+            elif layer[0] == 'head':
+                self.screen.blit(self.head_sprites[(layer[1], layer[2])], cell_rect)
             else:
-                # AI snake: Dark blue head, blue body
-                color = BLUE if i > 0 else (0, 0, 150)
-                
-            pygame.draw.rect(self.screen, color, snake_rect)
-            
-            # Draw eyes on the head
-            if i == 0:
-                self.draw_snake_eyes(x, y, self.game_state.direction if is_player else self.game_state.ai_direction)
+                path_pos = (cell_rect.x + self.cell_size // 4, cell_rect.y + self.cell_size // 4)
+                self.screen.blit(self.path_markers[layer[1]], path_pos)
+        return cell_rect
+    
+    def cells_under(self, rect):
+        """Visible board cells overlapping a screen rect"""
+        size = self.cell_size
+        left = self.view.x + max(0, rect.left // size)
+        right = self.view.x + min(self.view.width - 1, (rect.right - 1) // size)
+        top = self.view.y + max(0, rect.top // size)
+        bottom = self.view.y + min(self.view.height - 1, (rect.bottom - 1) // size)
+        return [(x, y) for x in range(left, right + 1) for y in range(top, bottom + 1)]
     
-    def draw_snake_eyes(self, x, y, direction):
+    def draw_snake_eyes(self, surface, x, y, direction):
         """Draw eyes on the snake's head based on direction"""
+        size = self.cell_size
         # Determine eye positions based on direction
         if direction == (1, 0):  # Right
-            left_eye = (x * GRID_SIZE + GRID_SIZE * 0.7, y * GRID_SIZE + GRID_SIZE * 0.3)
-            right_eye = (x * GRID_SIZE + GRID_SIZE * 0.7, y * GRID_SIZE + GRID_SIZE * 0.7)
+            left_eye = (x * size + size * 0.7, y * size + size * 0.3)
+            right_eye = (x * size + size * 0.7, y * size + size * 0.7)
         elif direction == (-1, 0):  # Left
-            left_eye = (x * GRID_SIZE + GRID_SIZE * 0.3, y * GRID_SIZE + GRID_SIZE * 0.3)
-            right_eye = (x * GRID_SIZE + GRID_SIZE * 0.3, y * GRID_SIZE + GRID_SIZE * 0.7)
+            left_eye = (x * size + size * 0.3, y * size + size * 0.3)
+            right_eye = (x * size + size * 0.3, y * size + size * 0.7)
         elif direction == (0, -1):  # Up
-            left_eye = (x * GRID_SIZE + GRID_SIZE * 0.3, y * GRID_SIZE + GRID_SIZE * 0.3)
-            right_eye = (x * GRID_SIZE + GRID_SIZE * 0.7, y * GRID_SIZE + GRID_SIZE * 0.3)
+            left_eye = (x * size + size * 0.3, y * size + size * 0.3)
+            right_eye = (x * size + size * 0.7, y * size + size * 0.3)
         else:  # Down
-            left_eye = (x * GRID_SIZE + GRID_SIZE * 0.3, y * GRID_SIZE + GRID_SIZE * 0.7)
-            right_eye = (x * GRID_SIZE + GRID_SIZE * 0.7, y * GRID_SIZE + GRID_SIZE * 0.7)
+            left_eye = (x * size + size * 0.3, y * size + size * 0.7)
+            right_eye = (x * size + size * 0.7, y * size + size * 0.7)
             
         # Draw the eyes (white with black pupils)
-        pygame.draw.circle(self.screen, WHITE, (int(left_eye[0]), int(left_eye[1])), int(GRID_SIZE * 0.15))
-        pygame.draw.circle(self.screen, WHITE, (int(right_eye[0]), int(right_eye[1])), int(GRID_SIZE * 0.15))
-        pygame.draw.circle(self.screen, BLACK, (int(left_eye[0]), int(left_eye[1])), int(GRID_SIZE * 0.07))
-        pygame.draw.circle(self.screen, BLACK, (int(right_eye[0]), int(right_eye[1])), int(GRID_SIZE * 0.07))
+        pygame.draw.circle(surface, WHITE, (int(left_eye[0]), int(left_eye[1])), int(size * 0.15))
+        pygame.draw.circle(surface, WHITE, (int(right_eye[0]), int(right_eye[1])), int(size * 0.15))
+        pygame.draw.circle(surface, BLACK, (int(left_eye[0]), int(left_eye[1])), int(size * 0.07))
+        pygame.draw.circle(surface, BLACK, (int(right_eye[0]), int(right_eye[1])), int(size * 0.07))
     
-    def draw_path(self):
-        """Draw the AI path with fading effect"""
-        if self.game_state.state in [RUNNING, PAUSED] and hasattr(self.game_state, 'path'):
-            for i, (x, y) in enumerate(self.game_state.path):
-                path_rect = pygame.Rect(
-                    x * GRID_SIZE + GRID_SIZE // 4, 
-                    y * GRID_SIZE + GRID_SIZE // 4, 
-                    GRID_SIZE // 2, GRID_SIZE // 2
-                )
-                alpha = 200 - min(i * 10, 150)  # Fade out based on distance
-                s = pygame.Surface((GRID_SIZE // 2, GRID_SIZE // 2))
-                s.set_alpha(alpha)
-                s.fill(BLUE)
-                self.screen.blit(s, path_rect)
+    def blit_ui(self, surface, dest):
+        """Blit a UI element, remembering where so it can be erased next frame"""
+        self.ui_rects.append(self.screen.blit(surface, dest))
+    
+    def draw_button(self, button):
+        button.draw(self.screen)
+        self.ui_rects.append(button.rect)
     
     def draw_ui(self):
         """Draw UI elements like score, game status, buttons, etc."""
         # Draw score
-        score_text = FONT.render(f"Score: {self.game_state.score}", True, WHITE)
-        self.screen.blit(score_text, (10, 10))
+        score_text = render_text(FONT, f"Score: {self.game_state.score}", WHITE)
+        self.blit_ui(score_text, (10, 10))
         
         # Draw AI score if in 2P mode
         if hasattr(self.game_state, 'two_player_mode') and self.game_state.two_player_mode:
-            ai_score_text = FONT.render(f"AI Score: {self.game_state.ai_score}", True, BLUE)
-            self.screen.blit(ai_score_text, (10, 40))
+            ai_score_text = render_text(FONT, f"AI Score: {self.game_state.ai_score}", BLUE)
+            self.blit_ui(ai_score_text, (10, 40))
         
         # Draw double score indicator
         if hasattr(self.game_state, 'double_score_active') and self.game_state.double_score_active:
             remaining_time = max(0, self.game_state.double_score_duration - 
                                 (self.game_state.current_time - self.game_state.double_score_start_time))
-            double_score_text = SMALL_FONT.render(f"DOUBLE SCORE: {remaining_time:.1f}s", True, YELLOW)
-            self.screen.blit(double_score_text, (10, 70))
+            double_score_text = render_text(SMALL_FONT, f"DOUBLE SCORE: {remaining_time:.1f}s", YELLOW)
+            self.blit_ui(double_score_text, (10, 70))
+        
+        # Draw simulation speed when it is not real time
+        if hasattr(self.game_state, 'turbo') and self.game_state.turbo:
+            self.blit_ui(render_text(SMALL_FONT, "TURBO", YELLOW), (10, 95))
+        elif hasattr(self.game_state, 'speed') and self.game_state.speed != 1:
+            self.blit_ui(render_text(SMALL_FONT, f"SPEED x{self.game_state.speed:g}", YELLOW), (10, 95))
+        
+        # Draw safe mode indicator
+        if hasattr(self.game_state, 'safe_mode') and self.game_state.safe_mode:
+            self.blit_ui(render_text(SMALL_FONT, "SAFE MODE", GREEN), (10, 120))
+        
+        # Draw profiling overlay (toggled with P; the profiler refreshes the lines twice a second)
+        profiler = getattr(self.game_state, 'profiler', None)
+        if profiler is not None and profiler.visible:
+            for i, line in enumerate(profiler.overlay):
+                self.blit_ui(render_text(SMALL_FONT, line, WHITE), (10, 145 + 22 * i))
         
         # Draw algorithm name
         if hasattr(self.game_state, 'algorithms'):
-            algo_text = SMALL_FONT.render(f"Algorithm:", True, WHITE)
-            self.screen.blit(algo_text, (WIDTH - 200, 15))
+            algo_text = render_text(SMALL_FONT, f"Algorithm:", WHITE)
+            self.blit_ui(algo_text, (WIDTH - 200, 15))
             
             # Draw algorithm button
-            self.game_state.algo_button.draw(self.screen)
+            self.draw_button(self.game_state.algo_button)
         
         # Draw player mode button
-        self.player_mode_button.draw(self.screen)
+        self.draw_button(self.player_mode_button)
         
         # Draw game mode button
-        self.game_mode_button.draw(self.screen)
+        self.draw_button(self.game_mode_button)
         
         # Draw difficulty button
-        self.difficulty_button.draw(self.screen)
+        self.draw_button(self.difficulty_button)
         
         # Draw appropriate button based on game state
         if self.game_state.state == IDLE:
-            self.start_button.draw(self.screen)
+            self.draw_button(self.start_button)
         elif self.game_state.state == RUNNING:
-            self.pause_button.draw(self.screen)
+            self.draw_button(self.pause_button)
         elif self.game_state.state == PAUSED:
-            self.pause_button.draw(self.screen)
+            self.draw_button(self.pause_button)
         elif self.game_state.state == GAME_OVER:
-            self.restart_button.draw(self.screen)
-            game_over_text = FONT.render("GAME OVER", True, RED)
-            self.screen.blit(game_over_text, (WIDTH // 2 - 80, HEIGHT // 2 - 20))
+            self.draw_button(self.restart_button)
+            game_over_text = render_text(FONT, "GAME OVER", RED)
+            self.blit_ui(game_over_text, (WIDTH // 2 - 80, HEIGHT // 2 - 20))
             
             # Draw winner in 2P mode
             if hasattr(self.game_state, 'two_player_mode') and self.game_state.two_player_mode:
                 if self.game_state.score > self.game_state.ai_score:
-                    winner_text = FONT.render("Player Wins!", True, RED)
+                    winner_text = render_text(FONT, "Player Wins!", RED)
                 elif self.game_state.score < self.game_state.ai_score:
-                    winner_text = FONT.render("AI Wins!", True, BLUE)
+                    winner_text = render_text(FONT, "AI Wins!", BLUE)
                 else:
-                    winner_text = FONT.render("It's a Tie!", True, WHITE)
-                self.screen.blit(winner_text, (WIDTH // 2 - 80, HEIGHT // 2 + 20))
+                    winner_text = render_text(FONT, "It's a Tie!", WHITE)
+                self.blit_ui(winner_text, (WIDTH // 2 - 80, HEIGHT // 2 + 20))
         
         # Draw time remaining in challenge mode
         if hasattr(self.game_state, 'game_mode') and self.game_state.game_mode == 'Challenge':
             if self.game_state.state == RUNNING:
                 remaining = max(0, self.game_state.challenge_duration - 
                               (self.game_state.current_time - self.game_state.challenge_start_time))
-                time_text = FONT.render(f"Time: {remaining:.1f}s", True, YELLOW)
-                self.screen.blit(time_text, (WIDTH // 2 - 60, 10))
+                time_text = render_text(FONT, f"Time: {remaining:.1f}s", YELLOW)
+                self.blit_ui(time_text, (WIDTH // 2 - 60, 10))
         
         # Draw GIF button when appropriate
         if self.game_state.state == GAME_OVER or self.game_state.state == PAUSED:
-            self.gif_button.draw(self.screen)
+            self.draw_button(self.gif_button)
+        
+        # Draw export progress above the GIF button
+        self.check_export()
+        if self.export is not None:
+            bar = pygame.Rect(WIDTH // 2 - 120, HEIGHT - 38, 240, 6)
+            self.ui_rects.append(pygame.draw.rect(self.screen, GRAY, bar))
+            bar.width = int(bar.width * self.export.progress)
+            pygame.draw.rect(self.screen, GREEN, bar)
+        elif self.export_message and self.game_state.state in (GAME_OVER, PAUSED):
+            message_text = render_text(SMALL_FONT, self.export_message, WHITE)
+            self.blit_ui(message_text, message_text.get_rect(center=(WIDTH // 2, HEIGHT - 95)))
     
     def draw(self):
-        """Main draw method that renders the complete game screen"""
-        self.screen.fill(BLACK)
-        
-        # Draw grid for better visibility (now removed but function still called)
-        self.draw_grid()
-        
-        # Draw obstacles
-        if hasattr(self.game_state, 'obstacles'):
-            self.draw_obstacles()
+        """Redraw what changed since the last frame and push only those regions to the display"""
+        layers = self.cell_layers()
         
-        # Draw food
-        self.draw_food()
+        if self.background_grid is not self.game_state.grid:
+            self.configure_view()
+            self.full_redraw = True
+        if self.follow(self.game_state.snake[0]):
+            self.full_redraw = True
         
-        # Draw player snake
-        self.draw_snake(self.game_state.snake, True)
-        
-        # Draw AI snake in 2P mode
-        if hasattr(self.game_state, 'two_player_mode') and self.game_state.two_player_mode:
-            if hasattr(self.game_state, 'ai_snake'):
-                self.draw_snake(self.game_state.ai_snake, False)
-        
-        # Draw AI path
-        self.draw_path()
-        
-        # Draw UI elements
-        self.draw_ui()
+        if self.full_redraw:
+            # New board, scrolled view or exposed window: draw everything once
+            self.draw_background()
+            self.screen.blit(self.background, (0, 0))
+            for cell, cell_layers in layers.items():
+                self.draw_cell(cell, cell_layers)  # Skips cells out of view
+            self.ui_rects = []
+            self.draw_ui()
+            pygame.display.flip()
+            self.full_redraw = False
+        else:
+            # Cells whose contents changed, e.g. the new head, old tail, food and path,
+            # plus the board under last frame's UI so the UI can be drawn afresh
+            dirty = {cell for cell in layers.keys() | self.layers.keys()
+                     if layers.get(cell) != self.layers.get(cell)}
+            for rect in self.ui_rects:
+                self.screen.blit(self.background, rect, rect)
+                dirty.update(cell for cell in self.cells_under(rect) if cell in layers)
+            rects = [self.draw_cell(cell, layers.get(cell, ())) for cell in dirty]
+            rects = [rect for rect in rects if rect is not None] + self.ui_rects
+            
+            self.ui_rects = []
+            self.draw_ui()
+            pygame.display.update(rects + self.ui_rects)
         
-        # Update display
-        pygame.display.flip()
+        self.layers = layers
 
 
 def handle_button_events(renderer, game_state, mouse_pos):
     """Handle all button click events"""
     # Start/Pause/Restart button
     if game_state.state == IDLE and renderer.start_button.is_clicked(mouse_pos):
-        game_state.state = RUNNING
-        if hasattr(game_state, 'game_mode') and game_state.game_mode == 'Challenge':
-            game_state.challenge_start_time = game_state.current_time
+        game_state.start()
     elif game_state.state == RUNNING and renderer.pause_button.is_clicked(mouse_pos):
         game_state.state = PAUSED
     elif game_state.state == PAUSED and renderer.pause_button.is_clicked(mouse_pos):
-        game_state.state = RUNNING
-        if hasattr(game_state, 'game_mode') and game_state.game_mode == 'Challenge':
-            # Adjust challenge start time to account for pause duration
-            game_state.challenge_start_time += (game_state.current_time - game_state.pause_time)
+        # Resuming also shifts the challenge timer by the pause duration
+        game_state.start()
     elif game_state.state == GAME_OVER and renderer.restart_button.is_clicked(mouse_pos):
         return 'restart'
     
-    # GIF button
+    # GIF button (saves in the background; clicking again while saving cancels)
     if (game_state.state == GAME_OVER or game_state.state == PAUSED) and renderer.gif_button.is_clicked(mouse_pos):
         renderer.save_gif()
     
@@ -321,7 +504,7 @@ def handle_button_events(renderer, game_state, mouse_pos):
     if hasattr(game_state, 'algo_button') and game_state.algo_button.is_clicked(mouse_pos):
         game_state.current_algorithm = (game_state.current_algorithm + 1) % len(game_state.algorithms)
         game_state.algo_button.text = game_state.algorithms[game_state.current_algorithm]
-        game_state.path = []  # Reset path on algorithm change
+        game_state.path.clear()  # Reset path on algorithm change
     
     # Player mode toggle
     if renderer.player_mode_button.is_clicked(mouse_pos):
@@ -0,0 +1,388 @@
+from array import array
+from functools import lru_cache
+from astar import astar_search
+from grid import EMPTY, NO_CELL
+
+# Shortcuts off the cycle are only taken while the snake covers less than
+# this fraction of it; longer snakes follow the cycle exactly
+SHORTCUT_LIMIT = 0.5
+
+# Empty cycle cells a shortcut must leave between the head and the tail
+SAFETY_GAP = 4
+
+# Laps of the cycle the snake waits for food it cannot safely reach before
+# the game is given up as stalled
+STALL_LAPS = 3
+
+# Cell loops of the blocks the cycle is made of, as (dx, dy) steps clockwise
+# from the top left corner, by block width and height. Blocks are 2x2 except
+# in the last column and row of an odd-sized board, which take the extra
+# column or row; 3x3 has no loop through all nine cells, so the bottom right
+# corner of the board is left out
+BLOCK_LOOPS = {
+    (2, 2): [(0, 0), (1, 0), (1, 1), (0, 1)],
+    (2, 3): [(0, 0), (1, 0), (1, 1), (1, 2), (0, 2), (0, 1)],
+    (3, 2): [(0, 0), (1, 0), (2, 0), (2, 1), (1, 1), (0, 1)],
+    (3, 3): [(0, 0), (1, 0), (2, 0), (2, 1), (1, 1), (1, 2), (0, 2), (0, 1)],
+}
+
+class HamiltonianCycle:
+    """A cycle through every cell of the board's free blocks.
+
+    The board is split into blocks (see BLOCK_LOOPS) and a spanning tree is
+    grown over the largest connected group of blocks that hold no obstacle.
+    Walking around the outside of that tree visits each cell of those
+    blocks exactly once. Cells in blocks with an obstacle (and the bottom
+    right corner when both sides are odd) are left off the cycle.
+
+    self.cells lists the cycle's cell indices in order and self.order maps
+    a cell index to its position on the cycle (-1 when it is not on it).
+    """
+    def __init__(self, width, height, obstacles):
+        self.cells = array('i')
+        self.order = array('i', [-1]) * (width * height)
+        block_width, block_height = width // 2, height // 2
+        blocks = block_width * block_height
+        if not blocks:
+            return  # Too narrow for a single block
+
+        blocked = bytearray(blocks)
+        for index in obstacles:
+            x, y = index % width, index // width
+            blocked[min(y // 2, block_height - 1) * block_width + min(x // 2, block_width - 1)] = 1
+
+        # Breadth-first spanning trees of each group of blocks; keep the largest
+        parent = array('i', [-1]) * blocks
+        seen = bytearray(blocks)
+        tree = []
+        for root in range(blocks):
+            if blocked[root] or seen[root]:
+                continue
+            seen[root] = 1
+            component = [root]
+            for block in component:  # The list grows while it is walked, like a queue
+                bx = block % block_width
+                for neighbor, inside in ((block + 1, bx + 1 < block_width),
+                                         (block + block_width, block + block_width < blocks),
+                                         (block - 1, bx > 0),
+                                         (block - block_width, block >= block_width)):
+                    if inside and not blocked[neighbor] and not seen[neighbor]:
+                        seen[neighbor] = 1
+                        parent[neighbor] = block
+                        component.append(neighbor)
+            if len(component) > len(tree):
+                tree = component
+
+        # Each block on its own is a clockwise loop of its cells; every tree
+        # edge reroutes two of those moves to join the two loops into one.
+        # The moves rerouted lie in the top left 2x2 of each block, where all
+        # the loops agree, and the wider or taller blocks are always the
+        # right or lower block of a pair
+        following = array('i', [-1]) * (width * height)
+
+        def corner(block):
+            return (block // block_width) * 2 * width + (block % block_width) * 2
+
+        for block in tree:
+            top_left = corner(block)
+            shape = (3 if width % 2 and block % block_width == block_width - 1 else 2,
+                     3 if height % 2 and block // block_width == block_height - 1 else 2)
+            loop = [top_left + dy * width + dx for dx, dy in BLOCK_LOOPS[shape]]
+            for cell, next_cell in zip(loop, loop[1:] + loop[:1]):
+                following[cell] = next_cell
+        for block in tree[1:]:
+            first, second = sorted((parent[block], block))
+            a, b = corner(first), corner(second)
+            if second == first + 1 and second % block_width:
+                # Side by side: top right -> next top left, its bottom left -> our bottom right
+                following[a + 1] = b
+                following[b + width] = a + width + 1
+            else:
+                # One above the other: bottom right -> lower top right, its top left -> our bottom left
+                following[a + width + 1] = b + 1
+                following[b] = a + width
+
+        if tree:
+            start = cell = corner(tree[0])
+            while True:
+                self.order[cell] = len(self.cells)
+                self.cells.append(cell)
+                cell = following[cell]
+                if cell == start:
+                    break
+
+@lru_cache(maxsize=16)
+def build_cycle(width, height, obstacles):
+    """The cycle for a board size and frozenset of obstacle indices, shared between games"""
+    return HamiltonianCycle(width, height, obstacles)
+
+
+def routes_to_cycle(order, grid, start, own_tail=None):
+    """Shortest routes from start across free cells off the cycle onto it.
+
+    order maps a cell index to its cycle position (-1 off the cycle).
+    Returns (cycle position, route) pairs, each route listing the cells
+    after start up to and including the cycle cell. Cycle cells are only
+    reached when empty or own_tail, unless own_tail is None: then occupied
+    ones count too (from food, any of them may become the way in).
+    """
+    cells, adjacency = grid.cells, grid.adjacency
+    came_from = {start: None}
+    frontier = [start]
+    found = []
+    for index in frontier:  # The list grows while it is walked, like a queue
+        for neighbor in adjacency[4 * index:4 * index + 4]:
+            if neighbor == NO_CELL or neighbor in came_from:
+                continue
+            free = cells[neighbor] == EMPTY or neighbor == own_tail
+            if order[neighbor] != -1:
+                if free or own_tail is None:
+                    came_from[neighbor] = index
+                    found.append(neighbor)
+            elif free:
+                came_from[neighbor] = index
+                frontier.append(neighbor)
+
+    routes = []
+    for cell in found:
+        route = []
+        while cell != start:
+            route.append(cell)
+            cell = came_from[cell]
+        route.reverse()
+        routes.append((order[route[-1]], route))
+    return routes
+
+class HamiltonianPlanner:
+    """The cycle one game's snake follows, rerouted as the game goes on.
+
+    It starts as a copy of the board's shared cycle. Food in a cell off the
+    cycle is eaten on a detour: the snake steps off the cycle at an entry
+    cell, crosses free cells off it to the food and steps back on at an
+    exit cell further along. Taking a detour splices its route into the
+    cycle in place of the cycle cells between entry and exit, so the body
+    stays in cycle order and never blocks the cycle ahead of the head.
+    Entry and exit are picked to skip as few cycle cells as possible, and
+    the detour is only taken once those cells are all free.
+    """
+    def __init__(self, game):
+        self.grid = game.grid
+        obstacles = frozenset(self.grid.index(obstacle) for obstacle in game.obstacles)
+        cycle = build_cycle(self.grid.width, self.grid.height, obstacles)
+        # Copied: splice() reroutes them, and the built cycle is shared
+        self.cells = array('i', cycle.cells)
+        self.order = array('i', cycle.order)
+        self.food = None
+        self.detour = None
+        # Searches since the food off the cycle appeared, to give up waiting for a way in
+        self.waiting_for = None
+        self.waited = 0
+
+    def splice(self, entry, route, exit_position):
+        """Reroute the cycle from the cell at entry through route to the cell at exit_position.
+
+        route lists cells off the cycle; the cycle cells between entry and
+        exit drop off it. The cycle is renumbered from the exit.
+        """
+        cells, order = self.cells, self.order
+        rotated = cells[exit_position:] + cells[:exit_position]
+        kept = (entry - exit_position) % len(cells) + 1
+        for cell in rotated[kept:]:
+            order[cell] = -1
+        self.cells = cells = rotated[:kept] + array('i', route)
+        for position, cell in enumerate(cells):
+            order[cell] = position
+        self.food = None  # Any planned detour was measured on the old cycle
+
+    def detour_to(self, food):
+        """(entry position, exit position, route from the entry to the food, route on to the exit), or None"""
+        if food == self.food:
+            return self.detour
+        self.food = food
+        self.detour = None
+
+        # Routes out of the food that leave it by different cells never cross,
+        # so one can be the way in and the other the way out
+        length = len(self.cells)
+        routes = sorted(routes_to_cycle(self.order, self.grid, food))
+        best_skip = length
+        for i, (entry, route_in) in enumerate(routes):
+            for j in range(1, len(routes)):
+                exit_position, route_out = routes[(i + j) % len(routes)]
+                if route_out[0] != route_in[0]:
+                    # The first such exit along the cycle skips the fewest cells
+                    if (exit_position - entry) % length < best_skip:
+                        best_skip = (exit_position - entry) % length
+                        self.detour = (entry, exit_position, route_in[-2::-1] + [food], route_out[:-1])
+                    break
+        if self.detour is None:
+            self.food = None  # Walled in for now: plan again next time
+        return self.detour
+
+    def rejoin(self, snake):
+        """Route from the head, off the cycle, back onto it; None if there is no safe one.
+
+        The route and the body back to the cycle cell it left from are
+        spliced into the cycle, so the snake is in cycle order again. The
+        cycle cells that drop off for it must not hold any of the body.
+        """
+        grid, order, cells = self.grid, self.order, self.grid.cells
+        head, tail = grid.index(snake[0]), grid.index(snake[-1])
+        routes = routes_to_cycle(order, grid, head, tail)
+
+        # The body off the cycle, newest first, and where it left the cycle
+        off = []
+        left = None
+        for pos in snake:
+            index = grid.index(pos)
+            if order[index] != -1:
+                left = order[index]
+                break
+            off.append(index)
+        if left is None:
+            # None of the body is on the cycle, so all of it is free
+            return min(routes, key=lambda item: len(item[1]))[1] if routes else None
+
+        length = len(self.cells)
+        for position, route in sorted(routes, key=lambda item: (item[0] - left) % length):
+            skip = (position - left) % length
+            if skip and all(cells[self.cells[(left + k) % length]] != cells[head] for k in range(1, skip)):
+                self.splice(left, off[::-1] + route[:-1], position)
+                return route
+        return None
+
+    def widen(self, snake):
+        """Route from the head through free cells off the cycle to the next cycle cell, or None.
+
+        The route is spliced into the cycle, which grows by its length.
+        """
+        grid, order = self.grid, self.order
+        head, tail = grid.index(snake[0]), grid.index(snake[-1])
+        position = order[head]
+        following = self.cells[(position + 1) % len(self.cells)]
+        for neighbor in grid.open_neighbors(head):
+            if order[neighbor] == -1:
+                for exit_position, route in routes_to_cycle(order, grid, neighbor, tail):
+                    if route[-1] == following:
+                        route = [neighbor] + route[:-1]
+                        self.splice(position, route, exit_position)
+                        return route
+        return None
+
+def hamiltonian_search(game, is_ai=False):
+    if is_ai:
+        snake = game.ai_snake
+    else:
+        snake = game.snake
+
+    start = snake[0]  # Head of the snake
+    if start == game.food:
+        return []
+
+    # The cycle is built once per board and reused while the board is in play
+    planner = game.planners.get(('Hamiltonian', is_ai))
+    if planner is None or planner.grid is not game.grid:
+        planner = HamiltonianPlanner(game)
+        game.planners[('Hamiltonian', is_ai)] = planner
+
+    grid = game.grid
+    order = planner.order
+    length = len(planner.cells)
+    if not length:
+        return astar_search(game, is_ai)  # Board too small or cluttered for a cycle
+    game.nodes_expanded += 1
+
+    head = grid.index(start)
+    tail = grid.index(snake[-1])
+    food = grid.index(game.food)
+    if order[head] == -1:
+        # Off the cycle (pushed off by the other snake, or after going for
+        # food the cycle could not take in): step back on
+        route = planner.rejoin(snake)
+        if route is not None:
+            return [grid.position(cell) for cell in route]
+        # No safe way back on yet: follow the tail, which keeps a way out open
+        tail_path = game.tail_check.path_to_tail(grid, snake)
+        if tail_path:
+            return tail_path[:1]
+        return [grid.position(neighbor) for neighbor in grid.open_neighbors(head)[:1]]
+
+    # The body trails the head along the cycle, so the cells from the head
+    # up to the tail are free; room counts them (none are known to be free
+    # while the tail is off the cycle)
+    position = order[head]
+    if len(snake) == 1:
+        room = length
+    elif order[tail] == -1:
+        room = 0
+    else:
+        room = (order[tail] - position) % length
+
+    # Food in a cell the cycle skips is eaten on a detour, taken like a
+    # shortcut once the cycle cells it skips are free
+    target = order[food]
+    reserve = 0
+    if target == -1:
+        if len(grid.free) == 1:
+            return astar_search(game, is_ai)  # The last free cell: eating it fills the board
+
+        target = position
+        detour = planner.detour_to(food)
+        if detour is not None:
+            target, exit_position, route_in, route_out = detour
+            reserve = (exit_position - target) % length
+            if target == position and reserve <= room:
+                exit_cell = planner.cells[exit_position]
+                if (all(grid.cells[cell] == EMPTY for cell in route_in + route_out) and
+                        (grid.cells[exit_cell] == EMPTY or exit_cell == tail)):
+                    planner.splice(position, route_in + route_out, exit_position)
+                    return [grid.position(cell) for cell in route_in]
+                planner.food = None  # The other snake is in the way: plan again next time
+
+        # Food the cycle cannot take in (walled off, or behind a detour that
+        # skips more cells than are ever free) stays out of reach for as
+        # long as the snake follows the cycle. After a whole lap it goes for
+        # the food by the shortest way that keeps its tail reachable, if
+        # there is one; food that is still out of reach after STALL_LAPS
+        # laps never will be, and the game ends instead of circling forever
+        if planner.waiting_for != food:
+            planner.waiting_for = food
+            planner.waited = 0
+        planner.waited += 1
+        if planner.waited > length:
+            path = astar_search(game, is_ai)
+            if (path and path[-1] == game.food and
+                    game.tail_check.tail_reachable_after(grid, snake, path, game.food, grid.cells[head])):
+                return path
+            if planner.waited > STALL_LAPS * length:
+                game.stall(is_ai)
+                return []
+
+    # A long snake needs every cell it can get: free cells off the cycle
+    # that lead from the head round to the next cycle cell join the cycle
+    if len(snake) >= SHORTCUT_LIMIT * length:
+        route = planner.widen(snake)
+        if route is not None:
+            return [grid.position(cell) for cell in route]
+
+    # A shortcut may skip ahead over free cycle cells, but never past the
+    # target and never closer than SAFETY_GAP to the tail (keeping room for
+    # the detour in reserve)
+    longest = 1
+    if len(snake) < SHORTCUT_LIMIT * length:
+        longest = max(1, min((target - position) % length, room - SAFETY_GAP - reserve))
+
+    best = None
+    best_skip = 0
+    for neighbor in game.neighbor_indices(head, is_ai):
+        neighbor_position = order[neighbor]
+        skip = (neighbor_position - position) % length
+        if neighbor_position != -1 and best_skip < skip <= longest:
+            best = neighbor
+            best_skip = skip
+
+    if best is None:
+        # The next cell on the cycle is taken (by the other snake): try any safe move
+        return [grid.position(neighbor) for neighbor in grid.open_neighbors(head)[:1]]
+
+    return [grid.position(best)]
@@ -0,0 +1,44 @@
+from collections import deque
+from grid import EMPTY
+
+class PathCache(deque):
+    """A planned path (consumed with popleft) that knows when it has gone stale.
+
+    The cache remembers the grid index of every cell still ahead on the path
+    and listens to the grid, so when something (usually the other snake's
+    head) moves onto one of those cells the path is marked invalid in O(1).
+    It also remembers which food it was planned for, so a moved food
+    invalidates it too.
+    """
+    def __init__(self, grid):
+        super().__init__()
+        self.grid = grid
+        self.cells = set()
+        self.target = None
+        self.valid = True
+        grid.listeners.append(self.cell_changed)
+
+    def replace(self, path, target):
+        """Cache a freshly planned path to target"""
+        super().clear()
+        self.extend(path)
+        self.cells = {self.grid.index(pos) for pos in path}
+        self.target = target
+        self.valid = True
+
+    def popleft(self):
+        pos = super().popleft()
+        self.cells.discard(self.grid.index(pos))
+        return pos
+
+    def clear(self):
+        super().clear()
+        self.cells.clear()
+
+    def cell_changed(self, index):
+        if index in self.cells and self.grid.cells[index] != EMPTY:
+            self.valid = False
+
+    def needs_replan(self, food):
+        """True if the path is used up, blocked, or leads to old food"""
+        return not self or not self.valid or self.target != food
@@ -0,0 +1,156 @@
+"""Where the game loop's time goes, frame by frame.
+
+SnakeGame.run marks the end of each phase of a frame (handling events,
+updating the simulation, drawing, and waiting for the next frame) and the
+engine reports every find_path call, so a frame that misses its deadline
+can be put down to search, drawing or a GIF export running alongside.
+
+Press P in the game for the overlay; `python main.py --profile FILE`
+writes the numbers at exit, as a JSON summary or, for a .csv file, one
+row per frame.
+"""
+import csv
+import json
+import time
+from bisect import bisect_left
+from collections import deque
+
+# Phases of a frame, in the order SnakeGame.run goes through them
+PHASES = ['events', 'update', 'draw', 'wait']
+
+# Upper edges of the histogram buckets, in milliseconds
+FRAME_BUCKETS = [4, 8, 12, 16.7, 20, 25, 33.3, 50, 100]
+SEARCH_BUCKETS = [0.1, 0.25, 0.5, 1, 2, 5, 10, 25, 50]
+
+# Frames kept for the per-frame log (10 minutes at 60 FPS)
+HISTORY = 36000
+
+# Columns of the per-frame log; times in milliseconds
+LOG_COLUMNS = ['frame', 'frame_ms'] + [f'{phase}_ms' for phase in PHASES] + \
+              ['search_ms', 'searches', 'nodes_expanded', 'exporting']
+
+def bucket_labels(edges):
+    return ([f"<{edges[0]:g}"] + [f"{low:g}-{high:g}" for low, high in zip(edges, edges[1:])] +
+            [f">={edges[-1]:g}"])
+
+class FrameProfiler:
+    """Phase timers, search timers, histograms and a dropped frame count.
+
+    Timing a frame costs one perf_counter() call per phase. A frame that
+    takes n times the target frame time counts n - 1 dropped frames
+    (rounded, so ordinary jitter does not count).
+    """
+    def __init__(self, target_fps=60, history=HISTORY):
+        self.target_fps = target_fps
+        self.visible = False  # Overlay shown
+
+        self.frames = 0
+        self.dropped_frames = 0
+        self.phase_total = dict.fromkeys(PHASES, 0.0)
+        self.phase_worst = dict.fromkeys(PHASES, 0.0)
+        self.frame_histogram = [0] * (len(FRAME_BUCKETS) + 1)
+        self.worst_frame = 0.0
+
+        self.searches = 0
+        self.search_time = 0.0
+        self.worst_search = 0.0
+        self.nodes_expanded = 0
+        self.search_histogram = [0] * (len(SEARCH_BUCKETS) + 1)
+
+        self.log = deque(maxlen=history)
+        self.overlay = []
+
+        # The frame in progress
+        self.last_mark = time.perf_counter()
+        self.phases = dict.fromkeys(PHASES, 0.0)
+        self.frame_searches = 0
+        self.frame_search_time = 0.0
+        self.frame_nodes = 0
+
+    def mark(self, phase):
+        """End phase: the time since the previous mark is charged to it"""
+        now = time.perf_counter()
+        self.phases[phase] += now - self.last_mark
+        self.last_mark = now
+
+    def search_done(self, elapsed, nodes):
+        """Record one find_path call (called by the engine)"""
+        self.frame_searches += 1
+        self.frame_search_time += elapsed
+        self.frame_nodes += nodes
+        self.search_histogram[bisect_left(SEARCH_BUCKETS, elapsed * 1000)] += 1
+        self.worst_search = max(self.worst_search, elapsed)
+
+    def end_frame(self, exporting=False):
+        """Fold the frame's phases into the totals and start the next frame"""
+        phases = self.phases
+        frame_time = sum(phases.values())
+        self.frames += 1
+        self.dropped_frames += max(0, round(frame_time * self.target_fps) - 1)
+        self.frame_histogram[bisect_left(FRAME_BUCKETS, frame_time * 1000)] += 1
+        self.worst_frame = max(self.worst_frame, frame_time)
+        for phase, elapsed in phases.items():
+            self.phase_total[phase] += elapsed
+            self.phase_worst[phase] = max(self.phase_worst[phase], elapsed)
+        self.searches += self.frame_searches
+        self.search_time += self.frame_search_time
+        self.nodes_expanded += self.frame_nodes
+
+        self.log.append((self.frames, frame_time * 1000, *(phases[phase] * 1000 for phase in PHASES),
+                         self.frame_search_time * 1000, self.frame_searches, self.frame_nodes,
+                         int(exporting)))
+        if self.visible and self.frames % (self.target_fps // 2 or 1) == 0:
+            self.overlay = self.overlay_lines()
+
+        self.phases = dict.fromkeys(PHASES, 0.0)
+        self.frame_searches = 0
+        self.frame_search_time = 0.0
+        self.frame_nodes = 0
+
+    def overlay_lines(self, frames=60):
+        """Averages over the last frames, as lines of text for the overlay"""
+        recent = list(self.log)[-frames:]
+        if not recent:
+            return []
+        columns = list(zip(*recent))
+        mean = {name: sum(values) / len(recent) for name, values in zip(LOG_COLUMNS, columns)}
+        worst = max(columns[LOG_COLUMNS.index('frame_ms')])
+        searches = sum(columns[LOG_COLUMNS.index('searches')])
+        nodes = sum(columns[LOG_COLUMNS.index('nodes_expanded')])
+        busy = mean['frame_ms'] - mean['wait_ms']
+        return [
+            f"FPS {1000 / mean['frame_ms']:.1f}  busy {busy:.1f} ms  worst {worst:.1f} ms",
+            f"events {mean['events_ms']:.2f}  update {mean['update_ms']:.2f}  draw {mean['draw_ms']:.2f} ms",
+            f"search {mean['search_ms']:.2f} ms/frame  {nodes // max(1, searches)} nodes/search",
+            f"dropped frames {self.dropped_frames} of {self.frames}",
+        ]
+
+    def summary(self):
+        frames = max(1, self.frames)
+        return {
+            'frames': self.frames,
+            'target_fps': self.target_fps,
+            'dropped_frames': self.dropped_frames,
+            'worst_frame_ms': self.worst_frame * 1000,
+            'phases': {phase: {'total_s': self.phase_total[phase],
+                               'mean_ms': self.phase_total[phase] * 1000 / frames,
+                               'worst_ms': self.phase_worst[phase] * 1000}
+                       for phase in PHASES},
+            'frame_ms_histogram': dict(zip(bucket_labels(FRAME_BUCKETS), self.frame_histogram)),
+            'searches': {'count': self.searches,
+                         'total_s': self.search_time,
+                         'mean_ms': self.search_time * 1000 / max(1, self.searches),
+                         'worst_ms': self.worst_search * 1000,
+                         'nodes_expanded': self.nodes_expanded,
+                         'ms_histogram': dict(zip(bucket_labels(SEARCH_BUCKETS), self.search_histogram))},
+        }
+
+    def export(self, path):
+        """Write the summary as JSON, or the per-frame log if path ends in .csv"""
+        with open(path, 'w', newline='') as f:
+            if path.endswith('.csv'):
+                writer = csv.writer(f)
+                writer.writerow(LOG_COLUMNS)
+                writer.writerows(self.log)
+            else:
+                json.dump(self.summary(), f, indent=2)
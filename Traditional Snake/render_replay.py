@@ -0,0 +1,98 @@
+"""Render a replay file to an animated GIF or to PNG frames at any cell size.
+
+Frames are drawn straight into palette images, so nothing is quantized
+and only one frame is held in memory at a time.
+
+    python render_replay.py replays/snake_20250101120000.replay --gif game.gif
+    python render_replay.py game.replay --png-dir frames --cell-size 8 --every 5
+"""
+import argparse
+import os
+from PIL import Image, ImageDraw
+from engine import FPS
+from gif_writer import StreamingGifWriter, build_palette
+from gui import BLACK, GRAY, GREEN, YELLOW, RED, DARK_RED, BLUE, DARK_BLUE, GRID_SIZE
+from replay import ReplayReader
+
+# Palette indices of the board colours
+COLORS = [BLACK, GRAY, GREEN, YELLOW, RED, DARK_RED, BLUE, DARK_BLUE]
+PALETTE = build_palette(COLORS)
+BACKGROUND, OBSTACLE, FOOD, BONUS_FOOD, PLAYER, PLAYER_HEAD, AI, AI_HEAD = range(len(COLORS))
+
+def draw_state(reader, state, cell_size):
+    """Draw the board of one replay state as a palette image"""
+    frame = Image.new('P', (reader.width * cell_size, reader.height * cell_size), BACKGROUND)
+    frame.putpalette(PALETTE)
+    draw = ImageDraw.Draw(frame)
+
+    def fill(pos, color):
+        x, y = pos[0] * cell_size, pos[1] * cell_size
+        draw.rectangle((x, y, x + cell_size - 1, y + cell_size - 1), fill=color)
+
+    for obstacle in reader.obstacles:
+        fill(obstacle, OBSTACLE)
+    fill(state.food, BONUS_FOOD if state.is_bonus_food else FOOD)
+    for snake, body, head in ((state.snake, PLAYER, PLAYER_HEAD), (state.ai_snake, AI, AI_HEAD)):
+        for i, cell in enumerate(snake):
+            fill(cell, head if i == 0 else body)
+    return frame
+
+def render_gif(path, filename, cell_size=GRID_SIZE, every=1):
+    """Write every every-th tick of a replay to filename as a GIF, yielding progress"""
+    reader = ReplayReader(path)
+    try:
+        total = reader.tick_count() + 1
+        duration_ms = int(1000 * reader.move_cooldown * every / FPS)
+        size = (reader.width * cell_size, reader.height * cell_size)
+        writer = StreamingGifWriter(filename, size, duration_ms, PALETTE)
+        try:
+            for state in reader.states():
+                if state.step % every == 0:
+                    writer.add_frame(draw_state(reader, state, cell_size))
+                yield (state.step + 1) / total
+        finally:
+            writer.close()
+    finally:
+        reader.close()
+
+def render_pngs(path, directory, cell_size=GRID_SIZE, every=1):
+    """Write every every-th tick of a replay to directory as numbered PNGs, yielding progress"""
+    os.makedirs(directory, exist_ok=True)
+    reader = ReplayReader(path)
+    try:
+        total = reader.tick_count() + 1
+        for state in reader.states():
+            if state.step % every == 0:
+                frame = draw_state(reader, state, cell_size)
+                frame.save(os.path.join(directory, f"frame_{state.step:06d}.png"))
+            yield (state.step + 1) / total
+    finally:
+        reader.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Render a snake replay file to GIF or PNG frames")
+    parser.add_argument('replay', help="replay file written by the game or tournament.py")
+    parser.add_argument('--gif', help="write an animated GIF to this file")
+    parser.add_argument('--png-dir', help="write one PNG per frame into this directory")
+    parser.add_argument('--cell-size', type=int, default=GRID_SIZE, help="pixels per board cell")
+    parser.add_argument('--every', type=int, default=1, help="render one frame every this many ticks")
+    args = parser.parse_args()
+    if not args.gif and not args.png_dir:
+        parser.error("give --gif and/or --png-dir")
+
+    jobs = []
+    if args.gif:
+        jobs.append((render_gif(args.replay, args.gif, args.cell_size, args.every), args.gif))
+    if args.png_dir:
+        jobs.append((render_pngs(args.replay, args.png_dir, args.cell_size, args.every), args.png_dir))
+    for steps, target in jobs:
+        shown = None
+        for progress in steps:
+            percent = int(100 * progress)
+            if percent != shown:
+                print(f"\r{target}: {percent}%", end="", flush=True)
+                shown = percent
+        print()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+"""Compact binary replays that record game state changes instead of pixels.
+
+A replay file is a header followed by one record per tick:
+
+    header   magic 'SNKR', version, flags, board size, game mode, difficulty,
+             algorithm, move cooldown, seed, then the starting board: player
+             head and direction, AI head and direction, food and obstacles
+    tick     one byte: bits 0-1 player direction, bit 2 player moved,
+             bits 3-4 AI direction, bit 5 AI moved, bits 6-7 how many times
+             the food was placed this tick (0-2), each followed by a uint32
+             food cell index with the bonus flag in bit 31
+    end      a tick byte with the food count set to 3, followed by the final
+             scores and the death cause
+
+Only head moves are stored: a snake grows exactly when its head lands on
+the food, so the tails follow from the moves. Most ticks take one byte,
+and the file can be read straight from a memory map.
+"""
+import mmap
+import struct
+from collections import deque
+from engine import ALGORITHMS
+
+MAGIC = b'SNKR'
+VERSION = 1
+
+# Direction codes, in the same order the searches try the moves
+DIRECTIONS = [(1, 0), (0, 1), (-1, 0), (0, -1)]
+GAME_MODES = ['Classic', 'Challenge', 'Survival']
+DIFFICULTIES = ['Easy', 'Normal', 'Hard']
+
+HEADER = struct.Struct('<4sBBHHBBBBq')
+START = struct.Struct('<IBIBII')  # player head, dir, AI head, dir, food, obstacle count
+CELL = struct.Struct('<I')
+END = struct.Struct('<IIH')  # score, AI score, death cause length
+
+TWO_PLAYER = 1
+HAS_SEED = 2
+BONUS = 1 << 31
+NO_CELL = 0xFFFFFFFF
+END_OF_GAME = 3 << 6
+
+class ReplayWriter:
+    """Streams a game to a replay file while it is played.
+
+    The engine calls food_placed() and record_tick() while self is its
+    recorder; finish() writes the final scores and closes the file.
+    """
+    def __init__(self, path, game):
+        self.path = path
+        self.width = game.grid.width
+        self.foods = []
+        self.file = open(path, 'wb')
+
+        flags = TWO_PLAYER if game.two_player_mode else 0
+        seed = 0
+        if game.seed is not None and -2**63 <= game.seed < 2**63:
+            flags |= HAS_SEED
+            seed = game.seed
+        self.file.write(HEADER.pack(
+            MAGIC, VERSION, flags, game.grid.width, game.grid.height,
+            GAME_MODES.index(game.game_mode), DIFFICULTIES.index(game.difficulty),
+            ALGORITHMS.index(game.algorithms[game.current_algorithm]),
+            int(game.move_cooldown), seed))
+
+        ai_head, ai_direction = NO_CELL, 0
+        if game.ai_snake:
+            ai_head = self.cell(game.ai_snake[0])
+            ai_direction = DIRECTIONS.index(game.ai_direction)
+        self.file.write(START.pack(
+            self.cell(game.snake[0]), DIRECTIONS.index(game.direction),
+            ai_head, ai_direction, self.food_cell(game.food, game.is_bonus_food),
+            len(game.obstacles)))
+        for obstacle in game.obstacles:
+            self.file.write(CELL.pack(self.cell(obstacle)))
+
+    def cell(self, pos):
+        return pos[1] * self.width + pos[0]
+
+    def food_cell(self, food, is_bonus):
+        return self.cell(food) | (BONUS if is_bonus else 0)
+
+    def food_placed(self, food, is_bonus):
+        self.foods.append(self.food_cell(food, is_bonus))
+
+    def move_bits(self, before, after):
+        """Direction code and moved flag for a head going from before to after"""
+        if before is None or before == after:
+            return 0
+        return DIRECTIONS.index((after[0] - before[0], after[1] - before[1])) | 4
+
+    def record_tick(self, game, player_head, ai_head):
+        """Write one tick, given where the heads were before it"""
+        record = self.move_bits(player_head, game.snake[0])
+        if ai_head is not None:
+            record |= self.move_bits(ai_head, game.ai_snake[0]) << 3
+        record |= len(self.foods) << 6
+        data = bytes([record])
+        for food in self.foods:
+            data += CELL.pack(food)
+        self.file.write(data)
+        self.foods.clear()
+
+    def flush(self):
+        if not self.file.closed:
+            self.file.flush()
+
+    def finish(self, game):
+        """Write the final scores and close the file"""
+        if self.file.closed:
+            return
+        cause = (game.death_cause or '').encode()
+        self.file.write(bytes([END_OF_GAME]) + END.pack(game.score, game.ai_score, len(cause)) + cause)
+        self.file.close()
+
+class ReplayState:
+    """The board at one tick of a replay"""
+    def __init__(self):
+        self.step = 0
+        self.snake = deque()
+        self.ai_snake = deque()
+        self.direction = DIRECTIONS[0]
+        self.ai_direction = DIRECTIONS[0]
+        self.food = None
+        self.is_bonus_food = False
+
+class ReplayReader:
+    """Reads a replay file through a memory map.
+
+    The header is parsed on open; states() then walks the ticks. A file
+    still being written (or cut short) is read up to its last whole tick,
+    in which case score, ai_score and death_cause stay None.
+    """
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        (magic, version, flags, self.width, self.height, game_mode, difficulty,
+         algorithm, self.move_cooldown, seed) = HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} snake replay")
+        self.two_player_mode = bool(flags & TWO_PLAYER)
+        self.seed = seed if flags & HAS_SEED else None
+        self.game_mode = GAME_MODES[game_mode]
+        self.difficulty = DIFFICULTIES[difficulty]
+        self.algorithm = ALGORITHMS[algorithm]
+
+        offset = HEADER.size
+        (self.start_head, self.start_direction, self.start_ai_head, self.start_ai_direction,
+         self.start_food, obstacle_count) = START.unpack_from(self.data, offset)
+        offset += START.size
+        self.obstacles = [self.pos(CELL.unpack_from(self.data, offset + i * CELL.size)[0])
+                          for i in range(obstacle_count)]
+        self.ticks_offset = offset + obstacle_count * CELL.size
+
+        self.score = None
+        self.ai_score = None
+        self.death_cause = None
+
+    def pos(self, cell):
+        return (cell % self.width, cell // self.width)
+
+    def close(self):
+        self.data.close()
+
+    def tick_count(self):
+        """Number of ticks in the file, found by skipping over the records"""
+        data = self.data
+        offset = self.ticks_offset
+        count = 0
+        while offset < len(data) and data[offset] != END_OF_GAME:
+            offset += 1 + (data[offset] >> 6) * CELL.size
+            count += 1
+        return count if offset <= len(data) else count - 1
+
+    def states(self):
+        """Yield the board before the first tick and after every tick.
+
+        The same ReplayState is updated in place and yielded each time.
+        """
+        data = self.data
+        state = ReplayState()
+        state.snake.append(self.pos(self.start_head))
+        state.direction = DIRECTIONS[self.start_direction]
+        if self.start_ai_head != NO_CELL:
+            state.ai_snake.append(self.pos(self.start_ai_head))
+            state.ai_direction = DIRECTIONS[self.start_ai_direction]
+        state.food = self.pos(self.start_food & ~BONUS)
+        state.is_bonus_food = bool(self.start_food & BONUS)
+        yield state
+
+        offset = self.ticks_offset
+        while offset < len(data):
+            record = data[offset]
+            if record == END_OF_GAME:
+                self.read_end(offset + 1)
+                return
+            food_count = record >> 6
+            if offset + 1 + food_count * CELL.size > len(data):
+                return  # Tick still being written
+            foods = deque(CELL.unpack_from(data, offset + 1 + i * CELL.size)[0]
+                          for i in range(food_count))
+            offset += 1 + food_count * CELL.size
+
+            # Same order as the engine: the player moves first, then the AI
+            if record & 4:
+                state.direction = DIRECTIONS[record & 3]
+                self.advance(state, state.snake, state.direction, foods)
+            if record & 32:
+                state.ai_direction = DIRECTIONS[(record >> 3) & 3]
+                self.advance(state, state.ai_snake, state.ai_direction, foods)
+            state.step += 1
+            yield state
+
+    def advance(self, state, snake, direction, foods):
+        head = (snake[0][0] + direction[0], snake[0][1] + direction[1])
+        snake.appendleft(head)
+        if head != state.food:
+            snake.pop()
+        elif foods:
+            food = foods.popleft()
+            state.food = self.pos(food & ~BONUS)
+            state.is_bonus_food = bool(food & BONUS)
+
+    def read_end(self, offset):
+        if offset + END.size > len(self.data):
+            return
+        self.score, self.ai_score, cause_length = END.unpack_from(self.data, offset)
+        offset += END.size
+        self.death_cause = self.data[offset:offset + cause_length].decode() or None
@@ -0,0 +1,124 @@
+"""Reset/step access to a SnakeEngine for external agents.
+
+    env = SnakeEnv(difficulty='Hard', seed=0)
+    observation = env.reset()
+    while True:
+        observation, reward, done, info = env.step(agent.act(observation))
+        if done:
+            break
+
+Observations are (channels, height, width) float32 planes: the agent's
+body, the opponent's body, obstacles, food, and the agent's head, which
+holds 1 + the action code of its last move. They live in one buffer that
+the engine updates in place as cells change, and step() returns a view of
+it rather than a copy, so copy an observation to keep it past the next step.
+"""
+import random
+import numpy as np
+from engine import SnakeEngine, GAME_OVER
+from grid import OBSTACLE, PLAYER, AI
+
+# Observation channels
+OWN_BODY, OPPONENT_BODY, OBSTACLES, FOOD, HEAD = range(5)
+CHANNELS = 5
+
+# Action codes: right, down, left, up
+DIRECTIONS = [(1, 0), (0, 1), (-1, 0), (0, -1)]
+
+class ObservationBuffer:
+    """Board planes for one engine, preallocated and updated cell by cell.
+
+    attach() fills the planes from the engine's grid and listens to it, so
+    every head insert, tail pop and obstacle updates its one cell of the
+    body and obstacle planes. The engine calls food_placed() and
+    heads_moved() (like a replay recorder) to move the food and head marks.
+    """
+    def __init__(self, width, height, own=PLAYER):
+        self.planes = np.zeros((CHANNELS, height, width), dtype=np.float32)
+        self.flat = self.planes.reshape(CHANNELS, width * height)  # Same memory, indexed by cell
+        self.own = own
+        self.opponent = AI if own == PLAYER else PLAYER
+        self.grid = None
+        self.food = None
+        self.head = None
+
+    def attach(self, game):
+        """Start following game's current board (called again after each reset)"""
+        self.grid = game.grid
+        cells = np.frombuffer(game.grid.cells, dtype=np.uint8)
+        self.flat[OWN_BODY] = cells == self.own
+        self.flat[OPPONENT_BODY] = cells == self.opponent
+        self.flat[OBSTACLES] = cells == OBSTACLE
+        self.flat[FOOD] = 0
+        self.flat[HEAD] = 0
+        self.food = None
+        self.head = None
+        game.grid.listeners.append(self.cell_changed)
+        self.heads_moved(game)
+
+    def cell_changed(self, index):
+        value = self.grid.cells[index]
+        flat = self.flat
+        flat[OWN_BODY, index] = value == self.own
+        flat[OPPONENT_BODY, index] = value == self.opponent
+        flat[OBSTACLES, index] = value == OBSTACLE
+
+    def food_placed(self, food):
+        if self.food is not None:
+            self.flat[FOOD, self.food] = 0
+        self.food = self.grid.index(food)
+        self.flat[FOOD, self.food] = 1
+
+    def heads_moved(self, game):
+        snake, direction = (game.snake, game.direction) if self.own == PLAYER else (game.ai_snake, game.ai_direction)
+        if self.head is not None:
+            self.flat[HEAD, self.head] = 0
+        if snake and game.grid.in_bounds(snake[0]):
+            self.head = game.grid.index(snake[0])
+            self.flat[HEAD, self.head] = 1 + DIRECTIONS.index(direction)
+        else:
+            self.head = None
+
+class SnakeEnv:
+    """An engine driven one move at a time by an agent's actions.
+
+    The agent steers the player snake; in two-player mode the AI snake is
+    its opponent and moves with the selected algorithm. Engine options
+    (game_mode, difficulty, two_player_mode, width, height, ...) are passed
+    through. As with the arrow keys, turning straight back is ignored. An
+    action of None lets the selected algorithm move the player in one-player
+    mode; in two-player mode the player is always steered by hand, so None
+    keeps it going in the same direction.
+
+    step() returns (observation, reward, done, info): reward is the score
+    gained by the move and info holds the score, length and death cause.
+    """
+    def __init__(self, seed=None, **options):
+        self.game = SnakeEngine(seed=seed, **options)
+        self.observation = ObservationBuffer(self.game.width, self.game.height)
+        self.game.observation = self.observation
+        self.observation.attach(self.game)
+        self.observation.food_placed(self.game.food)
+
+    def reset(self, seed=None):
+        """Start a new game (reseeded if seed is given) and return its first observation"""
+        game = self.game
+        if seed is not None:
+            game.seed = seed
+            game.rng = random.Random(seed)
+        game.reset_game()
+        game.start()
+        return self.observation.planes
+
+    def step(self, action=None):
+        game = self.game
+        game.manual_input = action is not None
+        if action is not None:
+            direction = DIRECTIONS[action]
+            if direction != (-game.direction[0], -game.direction[1]):
+                game.direction = direction
+
+        score = game.score
+        game.step()
+        info = {'score': game.score, 'length': len(game.snake), 'death_cause': game.death_cause}
+        return self.observation.planes, game.score - score, game.state == GAME_OVER, info
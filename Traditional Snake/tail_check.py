@@ -0,0 +1,97 @@
+from array import array
+from grid import EMPTY, NO_CELL
+
+class TailCheck:
+    """Flood fills that check a snake can still reach its tail.
+
+    The buffers are allocated once per board size and shared by every
+    check: instead of clearing them, each fill bumps self.generation and
+    a cell counts as seen (or as part of the virtual body) only when it is
+    stamped with the current generation.
+    """
+    def __init__(self, size):
+        self.size = size
+        self.generation = 0
+        self.seen = array('I', [0]) * size
+        self.body = array('I', [0]) * size
+        self.came_from = array('i', [0]) * size
+        self.queue = array('i', [0]) * size
+
+    def next_generation(self):
+        self.generation += 1
+        if self.generation == 2**32:
+            # Stamps wrapped around: start over from clean buffers
+            self.seen = array('I', [0]) * self.size
+            self.body = array('I', [0]) * self.size
+            self.generation = 1
+        return self.generation
+
+    def fill(self, grid, start, goal, owner):
+        """Breadth-first fill from start until goal is reached; True if it was.
+
+        A cell is open when it is empty or held by owner (the owner's own
+        cells are vacated unless stamped as body this generation).
+        """
+        cells, adjacency = grid.cells, grid.adjacency
+        generation = self.generation
+        seen, body, came_from, queue = self.seen, self.body, self.came_from, self.queue
+
+        seen[start] = generation
+        queue[0] = start
+        head, end = 0, 1
+        while head < end:
+            index = queue[head]
+            head += 1
+            for neighbor in adjacency[4 * index:4 * index + 4]:
+                if neighbor == NO_CELL or seen[neighbor] == generation:
+                    continue
+                if neighbor == goal:
+                    came_from[neighbor] = index
+                    return True
+                if body[neighbor] != generation and (cells[neighbor] == EMPTY or cells[neighbor] == owner):
+                    seen[neighbor] = generation
+                    came_from[neighbor] = index
+                    queue[end] = neighbor
+                    end += 1
+        return False
+
+    def tail_reachable_after(self, grid, snake, path, food, owner):
+        """Whether snake, having followed path, could still reach its tail.
+
+        The body after the path is laid out virtually (the snake grows by
+        one if the path ends on the food) and one fill is run from the new
+        head towards the new tail. A bite that fills the last free cell is
+        always safe: it ends the game with the board full.
+        """
+        length = len(snake) + (1 if path[-1] == food else 0)
+        if length < 3:
+            return True  # The tail is never more than a move away
+        if path[-1] == food and length == len(snake) + len(grid.free):
+            return True
+        generation = self.next_generation()
+        body = self.body
+
+        # The new body: the path (newest cell first), then the old body
+        virtual = [grid.index(pos) for pos in reversed(path[-length:])]
+        for pos in snake:
+            if len(virtual) == length:
+                break
+            virtual.append(grid.index(pos))
+        for index in virtual:
+            body[index] = generation
+        return self.fill(grid, virtual[0], virtual[-1], owner)
+
+    def path_to_tail(self, grid, snake):
+        """Shortest path from the head to the snake's current tail, or None"""
+        self.next_generation()
+        start, goal = grid.index(snake[0]), grid.index(snake[-1])
+        if not self.fill(grid, start, goal, EMPTY):
+            return None
+
+        path = []
+        index = goal
+        while index != start:
+            path.append((index % grid.width, index // grid.width))
+            index = self.came_from[index]
+        path.reverse()
+        return path
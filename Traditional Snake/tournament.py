@@ -0,0 +1,137 @@
+"""Play seeded headless games for every algorithm/mode/difficulty combination.
+
+Games are spread over all cores with a ProcessPoolExecutor. Each finished
+game is appended to a JSON Lines file as soon as its batch completes, and a
+summary table is printed at the end. With --replays every game is also
+archived as a replay file (see replay.py).
+
+    python tournament.py --games 1000 --out results.jsonl
+    python tournament.py --algorithms BFS A* --modes Survival --difficulties Hard
+    python tournament.py --games 10 --replays replays/
+    python tournament.py --algorithms BFS-Vectorized A* --width 200 --height 200
+"""
+import argparse
+import itertools
+import json
+import os
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from engine import SnakeEngine, ALGORITHMS, GRID_WIDTH, GRID_HEIGHT
+from replay import ReplayWriter
+
+GAME_MODES = ['Classic', 'Challenge', 'Survival']
+DIFFICULTIES = ['Easy', 'Normal', 'Hard']
+
+def replay_filename(algorithm, game_mode, difficulty, seed):
+    # Algorithm names like "A*" and "D* Lite" are not safe in file names
+    name = algorithm.replace('*', 'star').replace(' ', '_')
+    return f"{name}_{game_mode}_{difficulty}_{seed}.replay"
+
+def play_batch(algorithm, game_mode, difficulty, seeds, max_steps, replay_dir=None,
+               width=GRID_WIDTH, height=GRID_HEIGHT, safe_mode=False):
+    """Play one game per seed and return their results (runs in a worker)"""
+    results = []
+    for seed in seeds:
+        game = SnakeEngine(game_mode=game_mode, difficulty=difficulty,
+                           algorithm=algorithm, seed=seed, width=width, height=height,
+                           safe_mode=safe_mode)
+        if replay_dir:
+            path = os.path.join(replay_dir, replay_filename(algorithm, game_mode, difficulty, seed))
+            game.recorder = ReplayWriter(path, game)
+        game.play(max_steps)
+        if game.recorder is not None:
+            game.recorder.finish(game)
+        results.append(game.result())
+    return results
+
+def summarize(results):
+    """Aggregate per-game results into one row per configuration"""
+    groups = defaultdict(list)
+    for result in results:
+        groups[(result['algorithm'], result['game_mode'], result['difficulty'])].append(result)
+
+    rows = []
+    for (algorithm, game_mode, difficulty), games in sorted(groups.items()):
+        searches = sum(game['searches'] for game in games)
+        search_time = sum(game['search_time'] for game in games)
+        causes = Counter(game['death_cause'] for game in games)
+        rows.append({
+            'algorithm': algorithm,
+            'game_mode': game_mode,
+            'difficulty': difficulty,
+            'games': len(games),
+            'mean_score': sum(game['score'] for game in games) / len(games),
+            'max_score': max(game['score'] for game in games),
+            'mean_length': sum(game['length'] for game in games) / len(games),
+            'mean_steps': sum(game['steps'] for game in games) / len(games),
+            'ms_per_search': 1000 * search_time / searches if searches else 0.0,
+            'top_death_cause': causes.most_common(1)[0][0],
+        })
+    return rows
+
+def print_table(rows):
+    columns = ['algorithm', 'game_mode', 'difficulty', 'games', 'mean_score', 'max_score',
+               'mean_length', 'mean_steps', 'ms_per_search', 'top_death_cause']
+    cells = [[f"{row[c]:.2f}" if isinstance(row[c], float) else str(row[c]) for c in columns]
+             for row in rows]
+    widths = [max(len(c), *(len(line[i]) for line in cells)) for i, c in enumerate(columns)]
+    print("  ".join(c.ljust(w) for c, w in zip(columns, widths)))
+    for line in cells:
+        print("  ".join(cell.ljust(w) for cell, w in zip(line, widths)))
+
+def run_tournament(algorithms, game_modes, difficulties, games, out, workers=None,
+                   max_steps=10000, batch_size=16, base_seed=0, replay_dir=None,
+                   width=GRID_WIDTH, height=GRID_HEIGHT, safe_mode=False):
+    """Run every configuration and stream per-game results to out; return them all"""
+    if replay_dir:
+        os.makedirs(replay_dir, exist_ok=True)
+
+    tasks = []
+    for algorithm, game_mode, difficulty in itertools.product(algorithms, game_modes, difficulties):
+        # Every configuration plays the same seeds so they are compared on equal boards
+        seeds = list(range(base_seed, base_seed + games))
+        for i in range(0, games, batch_size):
+            tasks.append((algorithm, game_mode, difficulty, seeds[i:i + batch_size], max_steps,
+                          replay_dir, width, height, safe_mode))
+
+    results = []
+    with open(out, 'w') as f, ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(play_batch, *task) for task in tasks]
+        for done, future in enumerate(as_completed(futures), 1):
+            for result in future.result():
+                f.write(json.dumps(result) + "\n")
+                results.append(result)
+            f.flush()
+            print(f"\r{done}/{len(futures)} batches", end="", flush=True)
+    print()
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare snake AI algorithms on seeded headless games")
+    parser.add_argument('--algorithms', nargs='+', default=ALGORITHMS, choices=ALGORITHMS)
+    parser.add_argument('--modes', nargs='+', default=GAME_MODES, choices=GAME_MODES)
+    parser.add_argument('--difficulties', nargs='+', default=DIFFICULTIES, choices=DIFFICULTIES)
+    parser.add_argument('--games', type=int, default=100, help="games per configuration")
+    parser.add_argument('--max-steps', type=int, default=10000, help="end a game after this many moves")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="worker processes")
+    parser.add_argument('--batch-size', type=int, default=16, help="games per worker task")
+    parser.add_argument('--seed', type=int, default=0, help="seed of the first game")
+    parser.add_argument('--out', default='tournament_results.jsonl', help="per-game results (JSON Lines)")
+    parser.add_argument('--summary', help="also write the summary table to this JSON file")
+    parser.add_argument('--replays', help="archive every game as a replay file in this directory")
+    parser.add_argument('--width', type=int, default=GRID_WIDTH, help="board width in cells")
+    parser.add_argument('--height', type=int, default=GRID_HEIGHT, help="board height in cells")
+    parser.add_argument('--safe-mode', action='store_true', help="only take paths that leave the tail reachable")
+    args = parser.parse_args()
+
+    results = run_tournament(args.algorithms, args.modes, args.difficulties, args.games,
+                             args.out, args.workers, args.max_steps, args.batch_size, args.seed, args.replays,
+                             args.width, args.height, args.safe_mode)
+    rows = summarize(results)
+    print_table(rows)
+    if args.summary:
+        with open(args.summary, 'w') as f:
+            json.dump(rows, f, indent=2)
+
+if __name__ == "__main__":
+    main()